@@ -1,13 +1,13 @@
 import streamlit as st
-import json
+import hashlib
 import os
 from datetime import datetime
-import pandas as pd
-from PIL import Image
+# PIL is imported where used, so reruns that don't need it stay fast
 
-# Import your existing backend
-from extract import extract_website_data
-from rag import GeminiTestGenerator
+# Import your existing backend (crawling and generation run in job worker processes)
+from jobs import UPLOAD_DIR, JobStore, WorkerPool
+from result_index import ResultIndex, flatten_results, results_digest
+from exporters import ExportCache, iter_csv, iter_json, iter_jsonl, iter_junit, iter_testrail_csv
 
 # Page config
 st.set_page_config(
@@ -228,15 +228,93 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_job_store():
+    """Job queue shared by every user session of this server"""
+    return JobStore()
+
+@st.cache_resource
+def get_job_workers():
+    """Background worker processes that crawl and generate; started once per server"""
+    return WorkerPool().start()
+
+get_job_workers()
+
+@st.cache_resource(max_entries=8)
+def get_result_index(results_hash, _results):
+    """Search index for one result set, built once per result hash"""
+    return ResultIndex(flatten_results(_results))
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+def deferred_export(filename, chunks):
+    """Download data callable: the export is streamed to disk on first click and reused after"""
+    cache = get_export_cache()
+    results_hash = st.session_state.results_hash
+    
+    def read():
+        with open(cache.get(results_hash, filename, chunks), "rb") as f:
+            return f.read()
+    
+    return read
+
+def render_test(tc):
+    """One test case as an expander; main cases and suite tests have different fields"""
+    with st.expander(f"{tc.get('id')}: {tc.get('name')}"):
+        if tc.get('suite') == 'main':
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write(f"**Type:** {tc.get('type', 'N/A')}")
+            with col2:
+                st.write(f"**Priority:** {tc.get('priority', 'N/A')}")
+            with col3:
+                st.write(f"**Technique:** {tc.get('test_technique', 'N/A')}")
+        else:
+            st.write(f"**Description:** {tc.get('description', 'N/A')}")
+            st.write(f"**Priority:** {tc.get('priority', 'N/A')}")
+        
+        st.write("**Test Steps:**")
+        for step in tc.get('steps', []):
+            st.write(f"• {step}")
+        
+        st.write(f"**Expected Result:** {tc.get('expected_result', 'N/A')}")
+
+def show_page(index, ids, key):
+    """Render one page of ids; only that page's expanders are built"""
+    if not ids:
+        st.info("No test cases match")
+        return
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Per page", [10, 25, 50, 100], key=f"{key}_size")
+    pages = (len(ids) + page_size - 1) // page_size
+    with col2:
+        page = st.number_input("Page", 1, pages, 1, key=f"{key}_page")
+    with col3:
+        first = (page - 1) * page_size + 1
+        st.markdown(f"<br>Showing {first}-{min(page * page_size, len(ids))} of {len(ids)}", unsafe_allow_html=True)
+    for tc in index.page(ids, page, page_size):
+        render_test(tc)
+
 # Initialize session state
 if 'results' not in st.session_state:
     st.session_state.results = None
+if 'results_hash' not in st.session_state:
+    st.session_state.results_hash = None
+if 'job_id' not in st.session_state:
+    # Survives a browser refresh through the ?job= query parameter
+    st.session_state.job_id = st.query_params.get("job")
+if 'job_error' not in st.session_state:
+    st.session_state.job_error = None
 
 # Logo Section (Put your logo here)
 logo_col1, logo_col2, logo_col3 = st.columns([1, 2, 1])
 with logo_col2:
     # Uncomment and modify this when you have a logo
     if os.path.exists("logo.png"):
+        from PIL import Image
         logo = Image.open("logo.png")
         st.image(logo, width=500)
    
@@ -261,9 +339,13 @@ with st.sidebar:
     )
     
     if uploaded_pdf:
-        pdf_path = f"temp_{uploaded_pdf.name}"
-        with open(pdf_path, "wb") as f:
-            f.write(uploaded_pdf.getbuffer())
+        # Named by content so the job worker can find it after this run ends
+        pdf_bytes = uploaded_pdf.getbuffer()
+        pdf_path = os.path.join(UPLOAD_DIR, f"{hashlib.sha256(pdf_bytes).hexdigest()}.pdf")
+        if not os.path.exists(pdf_path):
+            os.makedirs(UPLOAD_DIR, exist_ok=True)
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_bytes)
         st.success(f"Loaded: {uploaded_pdf.name}")
     else:
         if os.path.exists("blackbox-07.pdf"):
@@ -273,6 +355,20 @@ with st.sidebar:
     
     st.markdown("<p style='color: #7F8C8D; font-size: 0.9rem;'>Crawling Settings</p>", unsafe_allow_html=True)
     max_pages = st.slider("Maximum pages", 1, 20, 6, label_visibility="collapsed")
+    crawl_workers = st.slider("Parallel crawl workers", 1, 4, 1)
+    crawl_backend = st.selectbox(
+        "Crawler",
+        ["browser", "hybrid", "http"],
+        help="browser: Edge for every page; hybrid: plain HTTP, Edge only for JavaScript-rendered pages; http: no browser"
+    )
+    incremental_crawl = st.checkbox(
+        "Incremental crawl",
+        help="Compare pages with the previous crawl of this site and report which changed"
+    )
+    per_page_generation = st.checkbox(
+        "Generate per page",
+        help="One prompt per page, cached by page content, so unchanged pages are not re-prompted"
+    )
     
     if st.session_state.results:
         st.markdown("---")
@@ -310,46 +406,47 @@ if st.button("Generate Test Cases", use_container_width=True):
     elif not url.startswith(('http://', 'https://')):
         st.error("URL must start with http:// or https://")
     else:
-        try:
-            # Step 1: Extract
-            st.markdown("<h2 class='section-header'>Step 1: Extracting Website Data</h2>", unsafe_allow_html=True)
-            with st.spinner("Analyzing website structure..."):
-                web_data = extract_website_data(url, max_pages)
-            
-            st.success(f"Successfully extracted data from {web_data['basic_info']['pages_crawled']} pages")
-            
-            # Step 2: Initialize AI
-            st.markdown("<h2 class='section-header'>Step 2: Initializing AI Engine</h2>", unsafe_allow_html=True)
-            with st.spinner("Loading AI model..."):
-                pdf_files = [pdf_path] if uploaded_pdf and os.path.exists(pdf_path) else None
-                generator = GeminiTestGenerator(pdf_paths=pdf_files)
-            
-            st.success("AI engine initialized successfully")
-            
-            # Step 3: Generate
-            st.markdown("<h2 class='section-header'>Step 3: Generating Test Cases</h2>", unsafe_allow_html=True)
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            status_text.text("Generating main test cases...")
-            progress_bar.progress(30)
-            
-            with st.spinner("AI is analyzing and generating tests..."):
-                results = generator.generate_all_tests(web_data, user_stories)
-            
-            progress_bar.progress(100)
-            status_text.text("Generation complete!")
-            
-            st.session_state.results = results
-            
-            # Cleanup
-            if uploaded_pdf and os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            
-            st.success("All test cases and suites generated successfully")
-            
-        except Exception as e:
-            st.error(f"Error: {str(e)}")
+        st.session_state.job_id = get_job_store().submit({
+            "url": url,
+            "max_pages": max_pages,
+            "crawl_workers": crawl_workers,
+            "backend": crawl_backend,
+            "incremental": incremental_crawl,
+            "per_page": per_page_generation,
+            "user_stories": user_stories,
+            "pdf_paths": [os.path.abspath(pdf_path)] if uploaded_pdf else None
+        })
+        st.query_params["job"] = st.session_state.job_id
+        st.session_state.results = None
+        st.session_state.results_hash = None
+        st.session_state.job_error = None
+
+@st.fragment(run_every=1.0)
+def show_job_status(job_id):
+    """Poll the job queue; reruns the whole page once the job has finished, which stops the polling"""
+    store = get_job_store()
+    job = store.get(job_id, with_result=False)
+    if job is None or job["status"] == "failed":
+        st.session_state.job_error = f"Job {job_id} not found" if job is None else job["error"]
+        st.rerun()
+    
+    st.markdown("<h2 class='section-header'>Generating Test Cases</h2>", unsafe_allow_html=True)
+    if job["status"] == "queued":
+        st.progress(0)
+        st.text(f"Queued - {store.queue_position(job_id)} jobs ahead")
+    elif job["status"] == "running":
+        st.progress(int(job["progress"]))
+        st.text(f"{job['stage'].replace('_', ' ').title()}: {job['message']}")
+    else:
+        st.session_state.results = store.get(job_id)["result"]
+        st.session_state.results_hash = results_digest(st.session_state.results)
+        st.rerun()
+
+if st.session_state.job_id and not st.session_state.results:
+    if st.session_state.job_error:
+        st.error(f"Error: {st.session_state.job_error}")
+    else:
+        show_job_status(st.session_state.job_id)
 
 # Display Results
 if st.session_state.results:
@@ -357,8 +454,14 @@ if st.session_state.results:
     st.markdown("<h2 class='section-header'>Generated Results</h2>", unsafe_allow_html=True)
     
     results = st.session_state.results
+    changes = results.get('web_data', {}).get('changes')
+    if changes:
+        st.info(f"Since the last crawl: {len(changes['new'])} new, {len(changes['changed'])} changed, {len(changes['unchanged'])} unchanged pages")
     main_tests = results['main_test_cases'].get('test_cases', [])
     suites = results['test_suites']
+    if st.session_state.results_hash is None:
+        st.session_state.results_hash = results_digest(results)
+    index = get_result_index(st.session_state.results_hash, results)
     
     # Summary Metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -372,7 +475,7 @@ if st.session_state.results:
         """, unsafe_allow_html=True)
     
     with col2:
-        positive = len([tc for tc in main_tests if tc.get('type') == 'positive'])
+        positive = len(index.search(filters={"suite": ["main"], "type": ["positive"]}))
         st.markdown(f"""
             <div class='metric-card'>
                 <p class='metric-value'>{positive}</p>
@@ -381,7 +484,7 @@ if st.session_state.results:
         """, unsafe_allow_html=True)
     
     with col3:
-        negative = len([tc for tc in main_tests if tc.get('type') == 'negative'])
+        negative = len(index.search(filters={"suite": ["main"], "type": ["negative"]}))
         st.markdown(f"""
             <div class='metric-card'>
                 <p class='metric-value'>{negative}</p>
@@ -407,26 +510,19 @@ if st.session_state.results:
     with tab1:
         st.markdown("<br>", unsafe_allow_html=True)
         
-        search = st.text_input("Search test cases", "", placeholder="Search by ID or name...")
+        search = st.text_input("Search test cases", "", placeholder="Search by ID, name, steps, technique or priority...")
         
-        for tc in main_tests:
-            if search and search.lower() not in tc.get('name', '').lower() and search.lower() not in tc.get('id', '').lower():
-                continue
-            
-            with st.expander(f"{tc.get('id')}: {tc.get('name')}"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.write(f"**Type:** {tc.get('type', 'N/A')}")
-                with col2:
-                    st.write(f"**Priority:** {tc.get('priority', 'N/A')}")
-                with col3:
-                    st.write(f"**Technique:** {tc.get('test_technique', 'N/A')}")
-                
-                st.write("**Test Steps:**")
-                for step in tc.get('steps', []):
-                    st.write(f"• {step}")
-                
-                st.write(f"**Expected Result:** {tc.get('expected_result', 'N/A')}")
+        facet_cols = st.columns(4)
+        filters = {"suite": ["main"]}
+        main_ids = index.search(filters=filters)
+        for col, (facet, label) in zip(facet_cols, [("type", "Type"), ("priority", "Priority"), ("test_technique", "Technique"), ("page", "Page")]):
+            counts = index.facet_counts(facet, main_ids)
+            if counts:
+                with col:
+                    filters[facet] = st.multiselect(label, list(counts), format_func=lambda v, c=counts: f"{v} ({c[v]})", key=f"facet_{facet}")
+        
+        # Filtering happens on the index postings; only the visible page is rendered
+        show_page(index, index.search(search, filters), "main")
     
     # TAB 2: Suites
     with tab2:
@@ -439,44 +535,33 @@ if st.session_state.results:
         
         for idx, (suite_name, suite_title) in enumerate(zip(suite_names, suite_titles)):
             with suite_tabs[idx]:
-                suite_tests = suites.get(suite_name, [])
-                st.write(f"**Total Tests:** {len(suite_tests)}")
+                suite_ids = index.search(filters={"suite": [suite_name]})
+                st.write(f"**Total Tests:** {len(suite_ids)}")
                 st.markdown("<br>", unsafe_allow_html=True)
                 
-                for test in suite_tests:
-                    with st.expander(f"{test.get('id')}: {test.get('name')}"):
-                        st.write(f"**Description:** {test.get('description', 'N/A')}")
-                        st.write(f"**Priority:** {test.get('priority', 'N/A')}")
-                        
-                        st.write("**Test Steps:**")
-                        for step in test.get('steps', []):
-                            st.write(f"• {step}")
-                        
-                        st.write(f"**Expected Result:** {test.get('expected_result', 'N/A')}")
+                show_page(index, suite_ids, suite_name)
     
     # TAB 3: Download
     with tab3:
         st.markdown("<br>", unsafe_allow_html=True)
         
+        # Nothing is serialized here: each button streams its export once per result set, on click
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Main Test Cases")
             
-            json_data = json.dumps(results['main_test_cases'], indent=2)
             st.download_button(
                 "Download JSON",
-                json_data,
+                deferred_export("main_test_cases.json", lambda: iter_json(results['main_test_cases'])),
                 "main_test_cases.json",
                 "application/json",
                 use_container_width=True
             )
             
-            df = pd.DataFrame(main_tests)
-            csv = df.to_csv(index=False)
             st.download_button(
                 "Download CSV",
-                csv,
+                deferred_export("main_test_cases.csv", lambda: iter_csv(main_tests)),
                 "main_test_cases.csv",
                 "text/csv",
                 use_container_width=True
@@ -485,24 +570,21 @@ if st.session_state.results:
         with col2:
             st.subheader("Test Suites")
             
-            all_suites = json.dumps(suites, indent=2)
             st.download_button(
                 "Download All Suites",
-                all_suites,
+                deferred_export("all_suites.json", lambda: iter_json(suites)),
                 "all_suites.json",
                 "application/json",
                 use_container_width=True
             )
             
             for suite_name in suite_names:
-                suite_data = json.dumps({
-                    "suite_name": suite_name,
-                    "tests": suites.get(suite_name, [])
-                }, indent=2)
-                
                 st.download_button(
                     f"{suite_name.replace('_', ' ').title()}",
-                    suite_data,
+                    deferred_export(
+                        f"{suite_name}_suite.json",
+                        lambda suite_name=suite_name: iter_json({"suite_name": suite_name, "tests": suites.get(suite_name, [])})
+                    ),
                     f"{suite_name}_suite.json",
                     "application/json",
                     key=f"dl_{suite_name}",
@@ -511,11 +593,37 @@ if st.session_state.results:
         
         st.markdown("<br>", unsafe_allow_html=True)
         
+        st.subheader("All Tests")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button(
+                "JSON Lines",
+                deferred_export("all_tests.jsonl", lambda: iter_jsonl(index.tests)),
+                "all_tests.jsonl",
+                "application/x-ndjson",
+                use_container_width=True
+            )
+        with col2:
+            st.download_button(
+                "JUnit XML",
+                deferred_export("all_tests.junit.xml", lambda: iter_junit(index.tests)),
+                "all_tests.junit.xml",
+                "application/xml",
+                use_container_width=True
+            )
+        with col3:
+            st.download_button(
+                "TestRail CSV",
+                deferred_export("all_tests.testrail.csv", lambda: iter_testrail_csv(index.tests)),
+                "all_tests.testrail.csv",
+                "text/csv",
+                use_container_width=True
+            )
+        
         st.subheader("Complete Package")
-        complete = json.dumps(results, indent=2)
         st.download_button(
             "Download Everything (JSON)",
-            complete,
+            deferred_export("complete_tests.json", lambda: iter_json(results)),
             f"complete_tests_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             "application/json",
             use_container_width=True
@@ -0,0 +1,234 @@
+from extract import CRAWL_BACKEND, extract_website_data
+from crawl_backends import create_driver_pool
+from exporters import iter_csv, iter_junit, iter_jsonl, write_stream
+from case_store import CASE_STORE_DIR, CaseStore
+from result_index import flatten_results
+from urllib.parse import urlparse
+import argparse
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+CRAWL_WORKERS = 2  # Sites crawled at once
+LLM_WORKERS = 2  # Sites generated at once (model calls are also capped by the LLM client)
+QUEUE_SIZE = 4  # Crawled sites waiting for generation before crawl workers pause
+OUTPUT_DIR = "batch_results"
+
+_DONE = object()
+
+
+def load_targets(sources):
+    """Targets from URLs and/or files
+
+    A file is read line by line: JSON objects with a "url" key (and
+    optionally "id", "max_pages", "user_stories") or plain URLs. Blank lines
+    and lines starting with # are skipped.
+    """
+    targets = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    targets.append(json.loads(line) if line.startswith("{") else {"url": line})
+        else:
+            targets.append({"url": source})
+
+    ids = set()
+    for i, target in enumerate(targets):
+        if not str(target.get("url", "")).startswith(("http://", "https://")):
+            raise ValueError(f"Target {i + 1} has no http(s) url: {target}")
+        target_id = str(target.get("id") or site_slug(target["url"]))
+        if target_id in ids:
+            target_id = f"{target_id}-{i + 1}"
+        ids.add(target_id)
+        target["id"] = target_id
+    return targets
+
+
+def site_slug(url):
+    """Filesystem-safe name for a site's result directory"""
+    parsed = urlparse(url)
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", f"{parsed.netloc}{parsed.path}".strip("/")) or "site"
+
+
+def save_results(results, output_dir):
+    """Write one site's results in the rag_test_results layout (all_tests.csv keeps steps one per line)"""
+    os.makedirs(output_dir, exist_ok=True)
+    main_test_cases = results["main_test_cases"]
+    test_suites = results["test_suites"]
+
+    with open(os.path.join(output_dir, "main_test_cases.json"), "w", encoding="utf-8") as f:
+        json.dump(main_test_cases, f, indent=2)
+    for suite_name, suite_tests in test_suites.items():
+        with open(os.path.join(output_dir, f"{suite_name}_suite.json"), "w", encoding="utf-8") as f:
+            json.dump({"suite_name": suite_name, "tests": suite_tests}, f, indent=2)
+    with open(os.path.join(output_dir, "web_data.json"), "w", encoding="utf-8") as f:
+        json.dump(results["web_data"], f, indent=2)
+
+    all_tests = flatten_results(results)
+    if all_tests:
+        write_stream(iter_csv(all_tests), os.path.join(output_dir, "all_tests.csv"))
+        write_stream(iter_jsonl(all_tests), os.path.join(output_dir, "all_tests.jsonl"))
+        write_stream(iter_junit(all_tests, results["web_data"].get("basic_info", {}).get("url", "Generated tests")),
+                     os.path.join(output_dir, "all_tests.junit.xml"))
+
+
+class BatchRunner:
+    """Crawl and generate tests for many sites as a two-stage pipeline
+
+    crawl_workers threads crawl sites and hand them to llm_workers threads
+    through a queue of queue_size; when generation falls behind, crawling
+    pauses instead of piling up crawled sites. Each site's results are
+    written to output_dir/<id>/ as soon as it finishes, and one status line
+    per site is appended to output_dir/summary.jsonl. Test cases also go to
+    the columnar case store (case_store.py) unless case_store_dir is None.
+    """
+
+    def __init__(self, generator, output_dir=OUTPUT_DIR, crawl_workers=CRAWL_WORKERS, llm_workers=LLM_WORKERS,
+                 queue_size=QUEUE_SIZE, max_pages=6, backend=None, incremental=False, user_stories=None,
+                 case_store_dir=CASE_STORE_DIR):
+        self.generator = generator
+        self.output_dir = output_dir
+        self.crawl_workers = crawl_workers
+        self.llm_workers = llm_workers
+        self.queue_size = queue_size
+        self.max_pages = max_pages
+        self.backend = backend
+        self.incremental = incremental
+        self.user_stories = user_stories
+        self.case_store = CaseStore(case_store_dir) if case_store_dir else None
+        self.summary_lock = threading.Lock()
+        self.driver_pool = None
+
+    def _record(self, target, status, started, **details):
+        entry = dict(
+            id=target["id"],
+            url=target["url"],
+            status=status,
+            seconds=round(time.monotonic() - started, 1),
+            **details
+        )
+        with self.summary_lock:
+            with open(os.path.join(self.output_dir, "summary.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        print(f"[{status}] {target['id']} ({entry['seconds']}s)")
+        return entry
+
+    def _crawl_worker(self, targets, crawled):
+        while True:
+            try:
+                target = targets.get_nowait()
+            except queue.Empty:
+                return
+            started = time.monotonic()
+            try:
+                web_data = extract_website_data(
+                    target["url"],
+                    target.get("max_pages", self.max_pages),
+                    backend=self.backend,
+                    driver_pool=self.driver_pool,
+                    incremental=self.incremental
+                )
+            except Exception as e:
+                self.results.append(self._record(target, "crawl_failed", started, error=str(e)))
+                continue
+            if not web_data["pages"]:
+                self.results.append(self._record(target, "crawl_failed", started, error="no pages crawled"))
+                continue
+            crawled.put((target, web_data, started))  # Blocks while the generation queue is full
+
+    def _llm_worker(self, crawled):
+        while True:
+            item = crawled.get()
+            if item is _DONE:
+                return
+            target, web_data, started = item
+            try:
+                results = self.generator.generate_all_tests(web_data, target.get("user_stories", self.user_stories))
+                save_results(results, os.path.join(self.output_dir, target["id"]))
+                if self.case_store is not None:
+                    self.case_store.add(results, site=target["url"])
+                self.results.append(self._record(
+                    target, "ok", started,
+                    pages=len(web_data.get("pages", {})),
+                    main_tests=len(results["main_test_cases"].get("test_cases", [])),
+                    ai_generated=results["main_test_cases"].get("metadata", {}).get("ai_generated", False)
+                ))
+            except Exception as e:
+                self.results.append(self._record(target, "generation_failed", started, error=str(e)))
+
+    def run(self, targets):
+        """Process every target; returns the summary entries in completion order"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.results = []
+        pending = queue.Queue()
+        for target in targets:
+            pending.put(target)
+        crawled = queue.Queue(maxsize=self.queue_size)
+
+        if (self.backend or CRAWL_BACKEND) != "http":
+            self.driver_pool = create_driver_pool(max_size=self.crawl_workers)
+
+        crawlers = [threading.Thread(target=self._crawl_worker, args=(pending, crawled), daemon=True) for _ in range(self.crawl_workers)]
+        generators = [threading.Thread(target=self._llm_worker, args=(crawled,), daemon=True) for _ in range(self.llm_workers)]
+        for thread in crawlers + generators:
+            thread.start()
+        try:
+            for thread in crawlers:
+                thread.join()
+            for _ in generators:
+                crawled.put(_DONE)
+            for thread in generators:
+                thread.join()
+        finally:
+            if self.driver_pool is not None:
+                self.driver_pool.shutdown()
+        return self.results
+
+
+def run_batch(targets, generator=None, **kwargs):
+    """Crawl and generate tests for a list of targets (see load_targets / BatchRunner)"""
+    if generator is None:
+        from rag import GeminiTestGenerator
+        generator = GeminiTestGenerator()
+    return BatchRunner(generator, **kwargs).run(targets)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate test cases for many websites")
+    parser.add_argument("sources", nargs="+", help="URLs and/or files of targets (JSONL with a url key, or one URL per line)")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--crawl-workers", type=int, default=CRAWL_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--max-pages", type=int, default=6)
+    parser.add_argument("--backend", choices=["browser", "http", "hybrid"])
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--pdf", action="append", help="Reference PDF (repeatable); defaults to blackbox-07.pdf")
+    parser.add_argument("--case-store", default=CASE_STORE_DIR, help="Columnar case store directory ('' to skip)")
+    args = parser.parse_args()
+
+    targets = load_targets(args.sources)
+    print(f"Batch: {len(targets)} sites -> {args.out}")
+
+    from rag import GeminiTestGenerator
+    summary = run_batch(
+        targets,
+        generator=GeminiTestGenerator(pdf_paths=args.pdf),
+        output_dir=args.out,
+        crawl_workers=args.crawl_workers,
+        llm_workers=args.llm_workers,
+        queue_size=args.queue_size,
+        max_pages=args.max_pages,
+        backend=args.backend,
+        incremental=args.incremental,
+        case_store_dir=args.case_store or None
+    )
+    ok = sum(1 for entry in summary if entry["status"] == "ok")
+    print(f"\n Batch complete: {ok}/{len(targets)} sites ok, results in {args.out}")
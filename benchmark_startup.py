@@ -0,0 +1,62 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules app.py used to import at top level, and what it imports now
+MODULES = ["pandas", "PIL.Image", "selenium.webdriver", "google.generativeai", "extract", "rag", "streamlit", "jobs"]
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_time(module):
+    """Seconds to import a module in a fresh interpreter (cold, no shared sys.modules)"""
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if output.returncode != 0:
+        return None
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def rerun_times(runs=5):
+    """First script run and reruns of app.py after typing a URL, in seconds
+
+    Uses Streamlit's AppTest, so nothing is served; job workers are
+    disabled and the job queue lives in a temporary directory.
+    """
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["JOBS_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - started
+
+    reruns = []
+    for i in range(runs):
+        started = time.perf_counter()
+        app.text_input[0].input(f"https://example.com/{i}").run()
+        reruns.append(time.perf_counter() - started)
+    return first, reruns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import cost and Streamlit rerun time of app.py")
+    parser.add_argument("--runs", type=int, default=5, help="Reruns to time after the first run")
+    args = parser.parse_args()
+
+    print("Cold import time per module:")
+    for module in MODULES:
+        seconds = import_time(module)
+        print(f"  {module:<22} {'not installed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+    first, reruns = rerun_times(args.runs)
+    print("\napp.py script runs:")
+    print(f"  first run              {first * 1000:8.1f} ms")
+    print(f"  rerun (median of {len(reruns)})   {statistics.median(reruns) * 1000:8.1f} ms")
@@ -0,0 +1,194 @@
+import argparse
+import ast
+import csv
+import glob
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from result_index import flatten_results, results_digest
+
+CASE_STORE_DIR = os.getenv("CASE_STORE_DIR", "case_store")  # month=YYYY-MM/<run id>.parquet
+COMPRESSION = "zstd"
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())  # Few distinct values, stored once per row group
+
+SCHEMA = pa.schema([
+    ("run_id", pa.string()),  # One generation run (result set) per file
+    ("site", CATEGORY),
+    ("generated_at", pa.timestamp("s", tz="UTC")),
+    ("suite", CATEGORY),
+    ("suite_type", CATEGORY),
+    ("id", pa.string()),
+    ("name", pa.string()),
+    ("type", CATEGORY),
+    ("priority", CATEGORY),
+    ("test_technique", CATEGORY),
+    ("page", pa.string()),
+    ("description", pa.string()),
+    ("steps", pa.list_(pa.string())),
+    ("expected_result", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+
+# Columns load() can filter on by value (OR within a column, AND across columns)
+FILTER_COLUMNS = ("site", "suite", "type", "priority", "test_technique")
+
+
+def parse_steps(steps) -> List[str]:
+    """Steps as a list, also from the Python-repr strings of the old all_tests.csv"""
+    if isinstance(steps, list):
+        return [str(step) for step in steps]
+    text = str(steps or "").strip()
+    if text.startswith("["):
+        try:
+            return [str(step) for step in ast.literal_eval(text)]
+        except (ValueError, SyntaxError):
+            pass
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None or value == "" else str(value)
+
+
+def to_table(tests: List[Dict], run_id: str, site: str, generated_at: datetime) -> pa.Table:
+    """Flat test dicts (as from flatten_results) as a table in SCHEMA"""
+    columns = {name: [] for name in SCHEMA.names}
+    for test in tests:
+        columns["run_id"].append(run_id)
+        columns["site"].append(site)
+        columns["generated_at"].append(generated_at)
+        columns["steps"].append(parse_steps(test.get("steps")))
+        for name in SCHEMA.names[3:]:
+            if name != "steps":
+                columns[name].append(_text(test.get(name)))
+    return pa.table(columns, schema=SCHEMA)
+
+
+class CaseStore:
+    """Generated test cases kept as Parquet, one file per run, partitioned by month
+
+    Each run is written once (the run id is the results digest, so adding
+    the same results again is a no-op). load() reads only the requested
+    columns, skips month directories outside the date range and pushes
+    value filters down to the row groups, so trend queries over many
+    months never parse JSON or CSV.
+    """
+
+    def __init__(self, directory: str = CASE_STORE_DIR):
+        self.directory = directory
+
+    def _path(self, run_id: str, generated_at: datetime) -> str:
+        return os.path.join(self.directory, f"month={generated_at:%Y-%m}", f"{run_id}.parquet")
+
+    def has_run(self, run_id: str) -> bool:
+        return bool(glob.glob(os.path.join(self.directory, "month=*", f"{run_id}.parquet")))
+
+    def write(self, table: pa.Table, run_id: str, generated_at: datetime) -> Optional[str]:
+        """Write one run's table atomically; returns its path, or None if the run is already stored"""
+        if self.has_run(run_id) or table.num_rows == 0:
+            return None
+        path = self._path(run_id, generated_at)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".run.", suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path, compression=COMPRESSION)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def add(self, results: Dict, site: str, generated_at: datetime = None) -> Optional[str]:
+        """Store the test cases of one generate_all_tests() result"""
+        generated_at = generated_at or datetime.now(timezone.utc)
+        run_id = results_digest(results)
+        return self.write(to_table(flatten_results(results), run_id, site, generated_at), run_id, generated_at)
+
+    def import_csv(self, path: str, site: str, generated_at: datetime = None) -> Optional[str]:
+        """Store an all_tests.csv written by the notebook or older batch runs (dated by file time by default)"""
+        if generated_at is None:
+            generated_at = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        with open(path, "rb") as f:
+            run_id = hashlib.sha256(f.read()).hexdigest()[:16]
+        with open(path, newline="", encoding="utf-8") as f:
+            tests = list(csv.DictReader(f))
+        return self.write(to_table(tests, run_id, site, generated_at), run_id, generated_at)
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.directory, format="parquet", schema=SCHEMA.append(pa.field("month", pa.string())),
+                          partitioning=PARTITIONING)
+
+    def load(self, columns: List[str] = None, since: datetime = None, until: datetime = None,
+             **filters: List[str]) -> pa.Table:
+        """Test cases generated in [since, until), restricted to columns and filter values
+
+        e.g. load(["suite", "priority", "generated_at"], since=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        suite=["security", "performance"])
+        """
+        if not os.path.isdir(self.directory):
+            return SCHEMA.empty_table().select(columns) if columns else SCHEMA.empty_table()
+        expression = None
+
+        def both(condition):
+            return condition if expression is None else expression & condition
+
+        if since is not None:
+            expression = both((ds.field("month") >= f"{since:%Y-%m}") & (ds.field("generated_at") >= pa.scalar(since, SCHEMA.field("generated_at").type)))
+        if until is not None:
+            expression = both((ds.field("month") <= f"{until:%Y-%m}") & (ds.field("generated_at") < pa.scalar(until, SCHEMA.field("generated_at").type)))
+        for column, values in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter on {column}; use one of {', '.join(FILTER_COLUMNS)}")
+            if values:
+                expression = both(ds.field(column).isin(list(values)))
+        return self.dataset().to_table(columns=columns or SCHEMA.names, filter=expression)
+
+    def trend(self, by: str = "suite", **kwargs) -> pa.Table:
+        """Test case counts per month and value of by (and runs per month), for trend analysis"""
+        table = self.load(["generated_at", "run_id", by], **kwargs)
+        month = pc.strftime(table["generated_at"], format="%Y-%m")
+        table = pa.table({"month": month, "run_id": table["run_id"], by: table[by].cast(pa.string())})
+        counts = table.group_by(["month", by]).aggregate([("run_id", "count"), ("run_id", "count_distinct")])
+        counts = counts.rename_columns(["month", by, "tests", "runs"])
+        return counts.sort_by([("month", "ascending"), (by, "ascending")])
+
+
+def _date(text: str) -> datetime:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar store of generated test cases")
+    parser.add_argument("--dir", default=CASE_STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Store existing all_tests.csv files")
+    import_cmd.add_argument("csv_files", nargs="+")
+    import_cmd.add_argument("--site", required=True)
+    import_cmd.add_argument("--date", type=_date, help="Generation date (YYYY-MM-DD); defaults to each file's time")
+    trend_cmd = commands.add_parser("trend", help="Print test counts per month")
+    trend_cmd.add_argument("--by", default="suite", choices=FILTER_COLUMNS)
+    trend_cmd.add_argument("--since", type=_date)
+    trend_cmd.add_argument("--until", type=_date)
+    for column in FILTER_COLUMNS:
+        trend_cmd.add_argument(f"--{column.replace('_', '-')}", dest=column, action="append")
+    args = parser.parse_args()
+
+    store = CaseStore(args.dir)
+    if args.command == "import":
+        for path in args.csv_files:
+            stored = store.import_csv(path, args.site, args.date)
+            print(f"{path} -> {stored}" if stored else f"{path} already stored")
+    else:
+        filters = {column: getattr(args, column) for column in FILTER_COLUMNS}
+        print(store.trend(args.by, since=args.since, until=args.until, **filters).to_pandas().to_string(index=False))
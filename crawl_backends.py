@@ -0,0 +1,435 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.edge.service import Service
+from selenium.webdriver.edge.options import Options
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from driver_pool import DriverPool
+from readiness import create_waiter, install_request_tracker
+from crawl_store import page_fingerprint
+import functools
+import json
+import time
+
+READINESS_STRATEGY = "auto"  # "auto", "ready_state", "network_idle", "dom_quiescence" or "fixed" (sleep 1s)
+READINESS_ADAPTIVE = True  # Learn a per-domain wait timeout from earlier pages
+EXTRACTION_MODE = "script"  # "script": one execute_script per page; "elements": per-element WebDriver calls
+
+# Collects every input/button/link descriptor in one round trip. Mirrors what
+# get_attribute()/.text return: resolved properties, and "" for the text of
+# elements that are not rendered.
+EXTRACT_SCRIPT = """
+const visibleText = el => el.getClientRects().length ? (el.innerText || "").trim() : "";
+return JSON.stringify({
+    inputs: Array.from(document.getElementsByTagName("input"), el => ({
+        name: el.getAttribute("name") || "",
+        type: el.type || el.getAttribute("type") || "",
+        placeholder: el.getAttribute("placeholder") || ""
+    })),
+    buttons: Array.from(document.getElementsByTagName("button"), el => ({
+        text: visibleText(el),
+        type: el.type || el.getAttribute("type") || ""
+    })),
+    links: Array.from(document.getElementsByTagName("a"), el => ({
+        text: visibleText(el),
+        href: el.hasAttribute("href") ? el.href : null
+    }))
+});
+"""
+
+
+def create_edge_driver(page_load_strategy="normal"):
+    """Start a headless Edge session, preferring webdriver-manager for the driver binary"""
+    edge_options = Options()
+    edge_options.page_load_strategy = page_load_strategy
+    edge_options.add_argument('--headless')
+    edge_options.add_argument('--no-sandbox')
+    edge_options.add_argument('--disable-dev-shm-usage')
+    edge_options.add_argument('--disable-gpu')
+    edge_options.add_argument('--window-size=1920,1080')
+
+    try:
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        driver = webdriver.Edge(
+            service=Service(EdgeChromiumDriverManager().install()),
+            options=edge_options
+        )
+        print("Edge driver initialized with webdriver-manager")
+        install_request_tracker(driver)
+        return driver
+    except ImportError:
+        print("webdriver-manager not installed")
+        print("Installing now... run: pip install webdriver-manager")
+        raise
+    except Exception as e:
+        print(f"webdriver-manager failed: {e}")
+        try:
+            driver = webdriver.Edge(options=edge_options)
+            print("Edge driver initialized directly")
+            install_request_tracker(driver)
+            return driver
+        except Exception as e2:
+            print(f"Error: {e2}")
+            print("\nPlease install webdriver-manager:")
+            print("pip install webdriver-manager")
+            raise
+
+
+def load_page(driver, url, waiter=None):
+    """Navigate, wait for the page body, then for readiness; returns the readiness record"""
+    driver.get(url)
+
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
+
+    waiter = waiter or create_waiter(READINESS_STRATEGY, READINESS_ADAPTIVE)
+    return waiter.wait(driver, url)
+
+
+def extract_page_elements(driver, mode=None):
+    """Raw input/button/link descriptors for the loaded page, before dedup"""
+    if (mode or EXTRACTION_MODE) == "script":
+        try:
+            return json.loads(driver.execute_script(EXTRACT_SCRIPT))
+        except Exception as e:
+            print(f"Script extraction failed, using per-element extraction: {e}")
+    
+    elements = {"inputs": [], "buttons": [], "links": []}
+
+    try:
+        for inp in driver.find_elements(By.TAG_NAME, "input"):
+            elements["inputs"].append({
+                "name": inp.get_attribute("name") or "",
+                "type": inp.get_attribute("type") or "",
+                "placeholder": inp.get_attribute("placeholder") or ""
+            })
+    except Exception as e:
+        print(f"Error extracting inputs: {e}")
+
+    try:
+        for btn in driver.find_elements(By.TAG_NAME, "button"):
+            elements["buttons"].append({
+                "text": btn.text.strip(),
+                "type": btn.get_attribute("type") or ""
+            })
+    except Exception as e:
+        print(f" Error extracting buttons: {e}")
+
+    try:
+        for a in driver.find_elements(By.TAG_NAME, "a"):
+            elements["links"].append({
+                "text": a.text.strip(),
+                "href": a.get_attribute("href")
+            })
+    except Exception as e:
+        print(f"Error extracting links: {e}")
+
+    return elements
+
+
+INPUT_TYPES = {
+    "button", "checkbox", "color", "date", "datetime-local", "email", "file", "hidden",
+    "image", "month", "number", "password", "radio", "range", "reset", "search",
+    "submit", "tel", "text", "time", "url", "week"
+}
+BUTTON_TYPES = {"submit", "reset", "button"}
+# Empty containers single-page apps mount into
+APP_MOUNT_IDS = {"root", "app", "__next", "__nuxt", "svelte", "ember-app"}
+USER_AGENT = "Mozilla/5.0 (compatible; TestinyCrawler/1.0)"
+
+
+class ElementParser(HTMLParser):
+    """Collect inputs, buttons and links from static HTML
+
+    Produces the same descriptors as EXTRACT_SCRIPT: lowercased input/button
+    types with browser defaults, and absolute hrefs. Text can't account for
+    CSS visibility, so hidden buttons/links keep their text here.
+    """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.elements = {"inputs": [], "buttons": [], "links": []}
+        self.open_text = []  # (kind, descriptor, text parts) for <button>/<a> being read
+        self.script_count = 0
+        self.text_chars = 0
+        self.empty_mount = False
+        self._mount_depth = None
+        self._mount_has_content = False
+        self._depth = 0
+        self._in_script = False
+        self._noscript_text = []
+        self._in_noscript = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        self._depth += 1
+        if self._mount_depth is not None and self._depth > self._mount_depth:
+            self._mount_has_content = True
+
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "input":
+            input_type = attrs.get("type", "").lower()
+            self.elements["inputs"].append({
+                "name": attrs.get("name", ""),
+                "type": input_type if input_type in INPUT_TYPES else "text",
+                "placeholder": attrs.get("placeholder", "")
+            })
+        elif tag == "button":
+            button_type = attrs.get("type", "").lower()
+            descriptor = {"text": "", "type": button_type if button_type in BUTTON_TYPES else "submit"}
+            self.elements["buttons"].append(descriptor)
+            self.open_text.append((tag, descriptor, []))
+        elif tag == "a":
+            href = attrs.get("href")
+            descriptor = {"text": "", "href": urljoin(self.base_url, href) if "href" in attrs else None}
+            self.elements["links"].append(descriptor)
+            self.open_text.append((tag, descriptor, []))
+        elif tag in ("script", "style", "template"):
+            self._in_script = True
+            self.script_count += tag == "script"
+        elif tag == "noscript":
+            self._in_noscript = True
+        elif tag == "div" and attrs.get("id") in APP_MOUNT_IDS and self._mount_depth is None:
+            self._mount_depth = self._depth
+            self._mount_has_content = False
+
+        if tag in ("input", "base", "br", "img", "meta", "link", "hr", "source", "wbr"):
+            self._depth -= 1  # void elements have no end tag
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "template"):
+            self._in_script = False
+        elif tag == "noscript":
+            self._in_noscript = False
+        elif tag in ("button", "a"):
+            for i in range(len(self.open_text) - 1, -1, -1):
+                if self.open_text[i][0] == tag:
+                    _, descriptor, parts = self.open_text.pop(i)
+                    descriptor["text"] = " ".join("".join(parts).split())
+                    break
+        if self._mount_depth is not None and self._depth == self._mount_depth and tag == "div":
+            self.empty_mount = self.empty_mount or not self._mount_has_content
+            self._mount_depth = None
+        self._depth = max(self._depth - 1, 0)
+
+    def handle_data(self, data):
+        if self._in_script:
+            return
+        if self._in_noscript:
+            self._noscript_text.append(data)
+            return
+        stripped = data.strip()
+        if stripped:
+            self.text_chars += len(stripped)
+            if self._mount_depth is not None:
+                self._mount_has_content = True
+        for _, _, parts in self.open_text:
+            parts.append(data)
+
+    def looks_js_rendered(self):
+        """Heuristic: an empty SPA mount point, a "enable JavaScript" notice, or scripts but no content"""
+        if self.empty_mount:
+            return True
+        if "javascript" in " ".join(self._noscript_text).lower():
+            return True
+        has_elements = any(self.elements.values())
+        return self.script_count > 0 and self.text_chars < 200 and not has_elements
+
+
+def parse_html(html, base_url):
+    parser = ElementParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+class BrowserBackend:
+    """Load pages in a headless Edge session, borrowed from driver_pool when given"""
+
+    def __init__(self, lazy=False, readiness=None, driver_pool=None):
+        self.driver = None
+        self.driver_pool = driver_pool
+        self.waiter = create_waiter(readiness or READINESS_STRATEGY, READINESS_ADAPTIVE)
+        # With a readiness strategy, get() only needs to wait for DOMContentLoaded
+        self.page_load_strategy = "normal" if (readiness or READINESS_STRATEGY) == "fixed" else "eager"
+        if not lazy:
+            self._start()
+
+    def _start(self):
+        if self.driver_pool is not None:
+            self.driver = self.driver_pool.acquire()
+        else:
+            self.driver = create_edge_driver(self.page_load_strategy)
+
+    def fetch(self, url):
+        if self.driver is None:
+            self._start()
+        readiness = load_page(self.driver, url, self.waiter)
+        elements = extract_page_elements(self.driver)
+        elements["readiness"] = readiness
+        return elements
+
+    def close(self):
+        if self.driver is not None:
+            if self.driver_pool is not None:
+                self.driver_pool.release(self.driver)
+            else:
+                self.driver.quit()
+            self.driver = None
+
+
+def create_driver_pool(max_size=4, **kwargs):
+    """Warm Edge session pool configured for READINESS_STRATEGY"""
+    page_load_strategy = "normal" if READINESS_STRATEGY == "fixed" else "eager"
+    return DriverPool(functools.partial(create_edge_driver, page_load_strategy), max_size=max_size, **kwargs)
+
+
+class HttpBackend:
+    """Fetch pages over a keep-alive connection pool and parse them without a browser"""
+
+    def __init__(self, timeout=10, pool_size=10):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_parsed(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "text/html")
+        if "html" not in content_type:
+            raise ValueError(f"not an HTML page ({content_type})")
+        parsed = parse_html(response.text, response.url)
+        parsed.validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        return parsed
+
+    def fetch(self, url):
+        parsed = self.fetch_parsed(url)
+        return dict(parsed.elements, validators=parsed.validators)
+
+    def close(self):
+        self.session.close()
+
+
+class HybridBackend:
+    """HTTP first; pages that look JavaScript-rendered are reloaded in a browser"""
+
+    def __init__(self, timeout=10, pool_size=10, driver_pool=None):
+        self.http = HttpBackend(timeout, pool_size)
+        self.browser = BrowserBackend(lazy=True, driver_pool=driver_pool)  # Only started if a page needs it
+
+    def fetch(self, url):
+        parsed = self.http.fetch_parsed(url)
+        if parsed.looks_js_rendered():
+            print(f"JS-rendered page, using browser: {url}")
+            return dict(self.browser.fetch(url), validators=parsed.validators)
+        return dict(parsed.elements, validators=parsed.validators)
+
+    def close(self):
+        self.http.close()
+        self.browser.close()
+
+
+class IncrementalBackend:
+    """Wrap a backend with change detection against a CrawlStore
+
+    A page stored with an ETag or Last-Modified is first confirmed with a
+    conditional GET; a 304 reuses the stored elements without loading the
+    page. Pages crawled less than recrawl_after seconds ago are reused
+    without any request. Everything else goes through the wrapped backend
+    and is compared by fingerprint. Results carry "fingerprint" and
+    "change" ("new", "changed" or "unchanged").
+    """
+
+    def __init__(self, backend, store, site, timeout=10, recrawl_after=0):
+        import requests
+
+        self.backend = backend
+        self.store = store
+        self.site = site
+        self.timeout = timeout
+        self.recrawl_after = recrawl_after
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def _not_modified(self, url, stored):
+        headers = {}
+        if stored["etag"]:
+            headers["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            headers["If-Modified-Since"] = stored["last_modified"]
+        if not headers:
+            return False
+        try:
+            # stream=True so a 200 doesn't download a body we are about to fetch again
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                return response.status_code == 304
+        except Exception:
+            return False
+
+    def _validators(self, url, elements):
+        """ETag/Last-Modified from the fetch itself, or from a HEAD request for browser pages"""
+        validators = elements.pop("validators", None)
+        if validators is not None:
+            return validators
+        try:
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            return {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            }
+        except Exception:
+            return {"etag": None, "last_modified": None}
+
+    def fetch(self, url):
+        stored = self.store.get(url)
+        if stored is not None:
+            fresh = self.recrawl_after and time.time() - stored["crawled_at"] < self.recrawl_after
+            if fresh or self._not_modified(url, stored):
+                self.store.touch(url)
+                return dict(stored["elements"], fingerprint=stored["fingerprint"], change="unchanged")
+
+        elements = self.backend.fetch(url)
+        validators = self._validators(url, elements)
+        fingerprint = page_fingerprint(elements)
+        if stored is None:
+            change = "new"
+        else:
+            change = "unchanged" if stored["fingerprint"] == fingerprint else "changed"
+        self.store.put(url, self.site, fingerprint, elements, validators["etag"], validators["last_modified"])
+        elements["fingerprint"] = fingerprint
+        elements["change"] = change
+        return elements
+
+    def close(self):
+        self.backend.close()
+        self.session.close()
+
+
+BACKENDS = {
+    "browser": BrowserBackend,
+    "http": HttpBackend,
+    "hybrid": HybridBackend,
+}
+
+
+def create_backend(name, driver_pool=None):
+    """Build a crawl backend by name; each crawl worker gets its own"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown crawl backend: {name}")
+    if name == "http":
+        return HttpBackend()
+    return BACKENDS[name](driver_pool=driver_pool)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+def page_fingerprint(elements):
+    """sha256 of a page's raw inputs, buttons and links (before cross-page dedup)"""
+    payload = json.dumps(
+        {key: elements.get(key, []) for key in ("inputs", "buttons", "links")},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CrawlStore:
+    """Per-URL fingerprints, HTTP validators and raw elements from earlier crawls (SQLite)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    site TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    elements TEXT NOT NULL,
+                    crawled_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_site ON pages (site)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, url):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, etag, last_modified, elements, crawled_at FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        fingerprint, etag, last_modified, elements, crawled_at = row
+        return {
+            "fingerprint": fingerprint,
+            "etag": etag,
+            "last_modified": last_modified,
+            "elements": json.loads(elements),
+            "crawled_at": crawled_at
+        }
+
+    def put(self, url, site, fingerprint, elements, etag=None, last_modified=None):
+        raw = {key: elements.get(key, []) for key in ("inputs", "buttons", "links")}
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, site, fingerprint, etag, last_modified, elements, crawled_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, site, fingerprint, etag, last_modified, json.dumps(raw, ensure_ascii=False), time.time())
+            )
+
+    def touch(self, url):
+        """Mark a page as confirmed unchanged now"""
+        with self.lock, self._connect() as conn:
+            conn.execute("UPDATE pages SET crawled_at = ? WHERE url = ?", (time.time(), url))
+
+    def urls_for_site(self, site):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT url FROM pages WHERE site = ?", (site,))]
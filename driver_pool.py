@@ -0,0 +1,146 @@
+import atexit
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class PooledDriver:
+    """A WebDriver session plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.jobs = 0
+        self.origins = set()  # Origins visited during the current job, cleared on release
+
+    def get(self, url):
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https"):
+            self.origins.add(f"{parsed.scheme}://{parsed.netloc}")
+        self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class DriverPool:
+    """Long-lived pool of warm browser sessions shared across crawl jobs
+
+    acquire() hands out an idle session (or starts one, up to max_size) after
+    a health check; release() wipes cookies and storage for the origins the
+    job visited and parks the session for the next job. Sessions older than
+    max_age seconds or used for max_jobs jobs are quit instead of reused.
+    """
+
+    def __init__(self, factory, max_size=4, max_age=30 * 60, max_jobs=50, acquire_timeout=120):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+        self.acquire_timeout = acquire_timeout
+        self.idle = []
+        self.in_use = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        atexit.register(self.shutdown)
+
+    def _expired(self, pooled):
+        return time.monotonic() - pooled.created_at > self.max_age or pooled.jobs >= self.max_jobs
+
+    def _healthy(self, pooled):
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Borrow a healthy session, blocking while max_size sessions are in use"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self.condition:
+                if self.closed:
+                    raise RuntimeError("Driver pool is shut down")
+                pooled = self.idle.pop() if self.idle else None
+                if pooled is None:
+                    if self.in_use >= self.max_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("No browser session became available")
+                        self.condition.wait(remaining)
+                        continue
+                self.in_use += 1
+
+            # Health checks and browser start-up happen outside the lock
+            if pooled is not None:
+                if not self._expired(pooled) and self._healthy(pooled):
+                    return pooled
+                self._quit(pooled)
+            try:
+                return PooledDriver(self.factory())
+            except Exception:
+                with self.condition:
+                    self.in_use -= 1
+                    self.condition.notify()
+                raise
+
+    def release(self, pooled):
+        """Reset a session's browsing state and return it to the pool"""
+        pooled.jobs += 1
+        keep = not self.closed and not self._expired(pooled) and self._reset(pooled)
+        if not keep:
+            self._quit(pooled)
+        with self.condition:
+            self.in_use -= 1
+            if keep and not self.closed:
+                self.idle.append(pooled)
+            elif keep:
+                self._quit(pooled)
+            self.condition.notify()
+
+    def _reset(self, pooled):
+        """Clear cookies, storage and cache so the next job starts clean"""
+        driver = pooled.driver
+        try:
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                for origin in pooled.origins:
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            except Exception:
+                # Not a Chromium session: clear what WebDriver itself can reach
+                driver.delete_all_cookies()
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            driver.get("about:blank")
+            pooled.origins.clear()
+            return True
+        except Exception:
+            return False
+
+    def warm(self, count=1):
+        """Start sessions ahead of the first job"""
+        started = [self.acquire() for _ in range(min(count, self.max_size))]
+        for pooled in started:
+            with self.condition:
+                self.in_use -= 1
+                self.idle.append(pooled)
+                self.condition.notify()
+
+    def stats(self):
+        with self.condition:
+            return {"idle": len(self.idle), "in_use": self.in_use, "max_size": self.max_size}
+
+    def shutdown(self):
+        """Quit every idle session; sessions still in use are quit on release"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.condition.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
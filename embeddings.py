@@ -0,0 +1,171 @@
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by the local embedder"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class Embedder:
+    """Base class for embedding backends"""
+
+    dim: int = 0
+
+    @property
+    def signature(self) -> str:
+        """Identifies the vector space; used to key cached embeddings"""
+        return type(self).__name__.lower()
+
+    def fit(self, embeddings: np.ndarray):
+        """Optional corpus statistics pass over the indexed document matrix"""
+        pass
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 matrix"""
+        raise NotImplementedError
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a single search query"""
+        return self.embed([query])[0]
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic offline embedder: hashed unigrams/bigrams, TF-IDF scored
+
+    Documents are embedded as log-TF cosine-normalized vectors that do not
+    depend on the corpus, so they can be cached per PDF; IDF weights are
+    applied on the query side only (SMART lnc.ltc weighting).
+    """
+
+    def __init__(self, dim: int = 1024, use_bigrams: bool = True):
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    @property
+    def signature(self) -> str:
+        return f"hashing-{self.dim}{'-bigrams' if self.use_bigrams else ''}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        if self.use_bigrams:
+            tokens = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def _buckets(self, text: str) -> np.ndarray:
+        features = self._features(text)
+        return np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) % self.dim for f in features),
+            dtype=np.int64,
+            count=len(features)
+        )
+
+    def _term_frequencies(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = self._buckets(text)
+            if buckets.size:
+                np.add.at(matrix[row], buckets, 1.0)
+        np.log1p(matrix, out=matrix)  # sublinear term frequency
+        return matrix
+
+    def fit(self, embeddings: np.ndarray):
+        """Learn smoothed IDF weights from bucket document frequencies"""
+        n_docs = embeddings.shape[0]
+        if n_docs == 0:
+            self.idf = np.ones(self.dim, dtype=np.float32)
+            return
+        doc_freq = np.count_nonzero(embeddings, axis=0).astype(np.float32)
+        self.idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return normalize_rows(self._term_frequencies(texts))
+
+    def embed_query(self, query: str) -> np.ndarray:
+        matrix = self._term_frequencies([query])
+        matrix *= self.idf
+        return normalize_rows(matrix)[0]
+
+
+class GeminiEmbedder(Embedder):
+    """Embedding backend using the Gemini embedding API"""
+
+    def __init__(self, model: str = "models/text-embedding-004"):
+        self.model = model
+
+    @property
+    def signature(self) -> str:
+        return "gemini-" + self.model.rsplit("/", 1)[-1]
+
+    def _embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        import google.generativeai as genai
+
+        result = genai.embed_content(
+            model=self.model,
+            content=texts,
+            task_type=task_type
+        )
+        matrix = np.asarray(result["embedding"], dtype=np.float32)
+        self.dim = matrix.shape[1]
+        return normalize_rows(matrix)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "retrieval_document")
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return self._embed([query], "retrieval_query")[0]
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "gemini": GeminiEmbedder,
+}
+
+
+def get_embedder(name: str = "hashing", **kwargs) -> Embedder:
+    """Build an embedding backend by name"""
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    return EMBEDDERS[name](**kwargs)
+
+
+class VectorIndex:
+    """Contiguous float32 matrix of unit vectors with cosine top-k search"""
+
+    def __init__(self, matrix: Optional[np.ndarray] = None):
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        if matrix is not None:
+            self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def search(self, query: np.ndarray, top_k: int = 3) -> List[int]:
+        """Return row ids of the top_k most similar vectors, best first"""
+        n = len(self)
+        if n == 0 or top_k <= 0:
+            return []
+
+        scores = self.matrix @ np.asarray(query, dtype=np.float32).ravel()
+        if top_k >= n:
+            candidates = np.arange(n)
+        else:
+            candidates = np.sort(np.argpartition(-scores, top_k - 1)[:top_k])
+        # Stable sort so ties resolve to document order
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order].tolist()
@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List
+from xml.sax.saxutils import escape, quoteattr
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", ".exports")  # Built exports, one directory per result hash
+KEEP_RESULT_SETS = 20  # Result hashes kept in EXPORT_DIR before the oldest are removed
+CSV_ROWS_PER_CHUNK = 200
+
+
+def iter_json(obj) -> Iterator[str]:
+    """Pretty-printed JSON, produced piece by piece instead of as one string"""
+    return json.JSONEncoder(indent=2).iterencode(obj)
+
+
+def iter_jsonl(tests: Iterable[Dict]) -> Iterator[str]:
+    """One JSON object per line"""
+    for test in tests:
+        yield json.dumps(test, ensure_ascii=False) + "\n"
+
+
+def _csv_chunks(header: List[str], rows: Iterable[List]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for n, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if n % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _steps_text(steps) -> str:
+    return "\n".join(str(step) for step in steps) if isinstance(steps, list) else str(steps or "")
+
+
+def iter_csv(tests: List[Dict], columns: List[str] = None) -> Iterator[str]:
+    """CSV with a column per field (first-seen order); steps one per line in their cell"""
+    if columns is None:
+        columns = list(dict.fromkeys(key for test in tests for key in test))
+    rows = (
+        [_steps_text(test.get(column)) if column == "steps" else test.get(column, "") for column in columns]
+        for test in tests
+    )
+    return _csv_chunks(columns, rows)
+
+
+TESTRAIL_PRIORITIES = {"critical": "Critical", "high": "High", "medium": "Medium", "low": "Low"}
+
+
+def iter_testrail_csv(tests: List[Dict]) -> Iterator[str]:
+    """CSV laid out for TestRail's importer: one case per row, the suite as its section"""
+    rows = (
+        [
+            f"{test.get('id', '')}: {test.get('name', '')}",
+            test.get("suite", ""),
+            test.get("type") or test.get("suite_type") or "",
+            TESTRAIL_PRIORITIES.get(str(test.get("priority", "")).lower(), "Medium"),
+            test.get("description", ""),
+            _steps_text(test.get("steps")),
+            test.get("expected_result", ""),
+        ]
+        for test in tests
+    )
+    return _csv_chunks(["Title", "Section", "Type", "Priority", "Preconditions", "Steps", "Expected Result"], rows)
+
+
+def iter_junit(tests: List[Dict], name: str = "Generated tests") -> Iterator[str]:
+    """JUnit XML with one <testsuite> per suite; cases carry their fields as properties"""
+    suites: Dict[str, List[Dict]] = {}
+    for test in tests:
+        suites.setdefault(test.get("suite", "main"), []).append(test)
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f"<testsuites name={quoteattr(name)} tests=\"{len(tests)}\">\n"
+    for suite_name, suite_tests in suites.items():
+        yield f"  <testsuite name={quoteattr(suite_name)} tests=\"{len(suite_tests)}\">\n"
+        for test in suite_tests:
+            case_name = f"{test.get('id', '')}: {test.get('name', '')}"
+            yield f"    <testcase classname={quoteattr(suite_name)} name={quoteattr(case_name)}>\n"
+            yield "      <properties>\n"
+            for field in ("type", "priority", "test_technique", "page"):
+                if test.get(field):
+                    yield f"        <property name={quoteattr(field)} value={quoteattr(str(test[field]))}/>\n"
+            yield "      </properties>\n"
+            body = _steps_text(test.get("steps"))
+            if test.get("expected_result"):
+                body += f"\nExpected: {test['expected_result']}"
+            yield f"      <system-out>{escape(body)}</system-out>\n"
+            yield "    </testcase>\n"
+        yield "  </testsuite>\n"
+    yield "</testsuites>\n"
+
+
+def write_stream(chunks: Iterable[str], path: str):
+    """Write text chunks to path atomically (temp file + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ExportCache:
+    """Exports built once per result hash and kept on disk
+
+    get() streams an export to <directory>/<results_hash>/<filename> the
+    first time it is asked for and returns the path afterwards, so reruns
+    and repeated downloads never serialize the results again.
+    """
+
+    def __init__(self, directory: str = EXPORT_DIR, keep: int = KEEP_RESULT_SETS):
+        self.directory = directory
+        self.keep = keep
+
+    def get(self, results_hash: str, filename: str, chunks: Callable[[], Iterable[str]]) -> str:
+        path = os.path.join(self.directory, results_hash, filename)
+        if not os.path.exists(path):
+            new_result_set = not os.path.isdir(os.path.dirname(path))
+            write_stream(chunks(), path)
+            if new_result_set:
+                self.prune()
+        return path
+
+    def prune(self):
+        """Remove the oldest result sets beyond keep"""
+        try:
+            entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        except FileNotFoundError:
+            return
+        entries = sorted((p for p in entries if os.path.isdir(p)), key=os.path.getmtime, reverse=True)
+        for stale in entries[self.keep:]:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -1,189 +1,278 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
+from crawl_backends import IncrementalBackend, create_backend
+from crawl_store import CrawlStore, page_fingerprint
+from frontier import Frontier, normalize_url, score_link
+from page_types import TemplateClusters
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse
-import time
+import argparse
+import functools
+import threading
 import json
 
-def extract_website_data(start_url, max_pages=6):
+EXTRACT_WORKERS = 1  # Crawl workers (browser sessions / HTTP clients) in parallel
+CRAWL_BACKEND = "browser"  # "browser" (Edge), "http" (no JavaScript) or "hybrid" (http, browser for JS-rendered pages)
+CRAWL_STORE_PATH = ".crawl_store.sqlite3"  # Page fingerprints for incremental crawls
+PRIORITIZE_FRONTIER = True  # Crawl likely form pages first; False is plain breadth-first
+TEMPLATE_LIMIT = 3  # Pages per page type whose links are followed (0 crawls every template page)
+RECRAWL_AFTER = 0  # Seconds a stored page is trusted without re-checking (0: always confirm)
+
+
+class CrawlState:
+    """Frontier, page budget and global dedup shared by all crawl workers
+
+    Every method takes the lock, so any number of workers can claim URLs
+    and record pages. A worker reserves one of the max_pages slots when it
+    claims a URL and gives it back if the page fails, so exactly max_pages
+    pages are recorded whenever the site has that many reachable pages.
+    URLs are normalized and deduplicated when queued (see frontier.py), and
+    with template_limit pages are grouped into page types (see page_types.py).
+    """
+
+    def __init__(self, start_url, max_pages, prioritize=True, template_limit=0):
+        self.max_pages = max_pages
+        self.domain = urlparse(normalize_url(start_url)).netloc
+        self.visited = set()
+        self.global_seen_inputs = set()
+        self.global_seen_buttons = set()
+        self.global_seen_hrefs = {f"{start_url}/#main", start_url}
+        self.pages = {}
+        self.frontier = Frontier(prioritize)
+        self.frontier.push(start_url)
+        self.clusters = TemplateClusters(template_limit) if template_limit else None
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def claim(self):
+        """Next URL to crawl, or None when the crawl is finished"""
+        with self.condition:
+            while True:
+                while self.frontier and len(self.pages) + self.in_flight < self.max_pages:
+                    current_url = self.frontier.pop()
+                    if current_url in self.visited:
+                        continue
+                    self.visited.add(current_url)
+                    if urlparse(current_url).netloc != self.domain:
+                        continue
+                    if self.clusters and not self.clusters.allow(current_url):
+                        continue
+                    self.in_flight += 1
+                    return current_url
+                if not self.in_flight:
+                    return None
+                # Pages still loading may add URLs or free their slot
+                self.condition.wait()
+
+    def release(self, url):
+        """Give back the slot of a page that could not be crawled"""
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def record(self, url, elements):
+        """Dedup a page's elements against everything seen so far and queue its links"""
+        page_inputs = []
+        page_buttons = []
+        page_links = []
+
+        with self.condition:
+            for inp in elements["inputs"]:
+                sig = (inp["name"], inp["type"], inp["placeholder"])
+                if sig not in self.global_seen_inputs:
+                    self.global_seen_inputs.add(sig)
+                    if not inp["name"] and not inp["placeholder"]:
+                        continue
+                    page_inputs.append(inp)
+
+            for btn in elements["buttons"]:
+                sig = (btn["text"], btn["type"])
+                if sig not in self.global_seen_buttons:
+                    self.global_seen_buttons.add(sig)
+                    if not btn["text"]:
+                        continue
+                    page_buttons.append(btn)
+
+            for link in elements["links"]:
+                href = link["href"]
+                if not href:
+                    continue
+                if href not in self.global_seen_hrefs:
+                    self.global_seen_hrefs.add(href)
+                    page_links.append(link)
+
+            self.pages[url] = {
+                "inputs": page_inputs,
+                "buttons": page_buttons,
+                "links": page_links
+            }
+            if elements.get("readiness"):
+                # Which readiness strategy fired and how long it waited
+                self.pages[url]["readiness"] = elements["readiness"]
+            # Content hash of the raw (pre-dedup) elements, so it doesn't depend on crawl order
+            self.pages[url]["fingerprint"] = elements.get("fingerprint") or page_fingerprint(elements)
+            if elements.get("change"):
+                # Incremental crawl: whether the page changed since the last run
+                self.pages[url]["change"] = elements["change"]
+
+            expand = True
+            if self.clusters:
+                # Typed on the raw elements: dedup empties repeated template parts
+                self.pages[url]["page_type"], expand = self.clusters.assign(url, elements)
+
+            depth = self.frontier.depth(url) + 1
+            for link in page_links if expand else []:
+                href = normalize_url(link["href"])
+                if href not in self.visited and urlparse(href).netloc == self.domain:
+                    self.frontier.push(href, score_link(link, self.pages[url], depth), depth)
+
+            self.in_flight -= 1
+            self.condition.notify_all()
+            return len(self.pages)
+
+
+def crawl_worker(state, backend, on_page=None):
+    """Claim URLs from the shared state until the crawl is finished"""
+    while True:
+        current_url = state.claim()
+        if current_url is None:
+            return
+
+        print(f"\nCrawling: {current_url}")
+
+        try:
+            elements = backend.fetch(current_url)
+        except Exception as e:
+            print(f"Skipped: {e}")
+            state.release(current_url)
+            continue
+
+        page_count = state.record(current_url, elements)
+        print(f"Crawled ({page_count}/{state.max_pages}): {current_url}")
+        if on_page:
+            on_page(page_count, state.max_pages, current_url)
+
+
+def summarize_changes(state, store):
+    """Which recorded pages are new, changed or unchanged since the stored crawl"""
+    changes = {"new": [], "changed": [], "unchanged": []}
+    for url, page in state.pages.items():
+        changes[page.get("change", "new")].append(url)
+    # Stored pages of the site this crawl didn't reach (removed, or beyond max_pages)
+    changes["not_seen"] = sorted(set(store.urls_for_site(state.domain)) - state.visited)
+    return changes
+
+
+def extract_website_data(start_url, max_pages=6, workers=None, backend=None, driver_pool=None, incremental=False,
+                         on_page=None):
     """
     Extract all elements from a website using Microsoft Edge
     
     Args:
         start_url: The URL to start crawling from
         max_pages: Maximum number of pages to crawl
+        workers: Number of crawl workers in parallel
+                 (defaults to EXTRACT_WORKERS)
+        backend: "browser", "http" or "hybrid" (defaults to CRAWL_BACKEND)
+        driver_pool: Optional DriverPool of warm browser sessions to borrow
+                     from instead of starting and quitting Edge per crawl
+        incremental: Compare pages with the fingerprints stored by earlier
+                     crawls in CRAWL_STORE_PATH, reusing unchanged pages
+        on_page: Optional callback(pages_recorded, max_pages, url), called
+                 from the crawl worker threads after each page
         
     Returns:
-        dict: Web data with pages, inputs, buttons, links
+        dict: Web data with pages, inputs, buttons, links, the "page_types"
+              the pages were grouped into, plus a "changes" report
+              (new/changed/unchanged/not_seen URLs) when incremental
     """
-    edge_options = Options()
-    edge_options.add_argument('--headless')
-    edge_options.add_argument('--no-sandbox')
-    edge_options.add_argument('--disable-dev-shm-usage')
-    edge_options.add_argument('--disable-gpu')
-    edge_options.add_argument('--window-size=1920,1080')
-
-    driver = None
-    
-    try:
-        from webdriver_manager.microsoft import EdgeChromiumDriverManager
-        driver = webdriver.Edge(
-            service=Service(EdgeChromiumDriverManager().install()),
-            options=edge_options
-        )
-        print("Edge driver initialized with webdriver-manager")
-    except ImportError:
-        print("webdriver-manager not installed")
-        print("Installing now... run: pip install webdriver-manager")
-        raise
-    except Exception as e:
-        print(f"webdriver-manager failed: {e}")
-        try:
-            driver = webdriver.Edge(options=edge_options)
-            print("Edge driver initialized directly")
-        except Exception as e2:
-            print(f"Error: {e2}")
-            print("\nPlease install webdriver-manager:")
-            print("pip install webdriver-manager")
-            raise
-    
-    visited = set()
-    global_seen_inputs = set()
-    global_seen_buttons = set()
-    global_seen_hrefs = {f"{start_url}/#main", start_url}
-    
-    pages = {}
-    
-    to_visit = [start_url]
-    domain = urlparse(start_url).netloc
-    
-    page_count = 0
-    
-    while to_visit and page_count < max_pages:
-        current_url = to_visit.pop(0)
-        
-        if current_url in visited:
-            continue
-        visited.add(current_url)
-        
-        if urlparse(current_url).netloc != domain:
-            continue
-        
-        print(f"\nCrawling ({page_count + 1}/{max_pages}): {current_url}")
-        
-        try:
-            driver.get(current_url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            time.sleep(1)
-            
-        except Exception as e:
-            print(f"Skipped: {e}")
-            continue
-        
-        page_inputs = []
-        page_buttons = []
-        page_links = []
+    workers = max(1, min(workers or EXTRACT_WORKERS, max_pages))
+    backend_name = backend or CRAWL_BACKEND
+    state = CrawlState(start_url, max_pages, PRIORITIZE_FRONTIER, TEMPLATE_LIMIT)
+    store = CrawlStore(CRAWL_STORE_PATH) if incremental else None
+    started = []
+    errors = []
 
+    def run_worker():
+        # Each worker starts its own backend, so browser sessions launch concurrently
         try:
-            for inp in driver.find_elements(By.TAG_NAME, "input"):
-                name = inp.get_attribute("name") or ""
-                input_type = inp.get_attribute("type") or ""
-                placeholder = inp.get_attribute("placeholder") or ""
-                
-                sig = (name, input_type, placeholder)
-                
-                if sig not in global_seen_inputs:
-                    global_seen_inputs.add(sig)
-                    
-                    if not name and not placeholder:
-                        continue
-                    
-                    page_inputs.append({
-                        "name": name,
-                        "type": input_type,
-                        "placeholder": placeholder
-                    })
-        except Exception as e:
-            print(f"Error extracting inputs: {e}")
-        
-        try:
-            for btn in driver.find_elements(By.TAG_NAME, "button"):
-                text = btn.text.strip()
-                btn_type = btn.get_attribute("type") or ""
-                
-                sig = (text, btn_type)
-                
-                if sig not in global_seen_buttons:
-                    global_seen_buttons.add(sig)
-                    
-                    if not text:
-                        continue
-                    
-                    page_buttons.append({
-                        "text": text,
-                        "type": btn_type
-                    })
+            worker_backend = create_backend(backend_name, driver_pool)
+            if store is not None:
+                worker_backend = IncrementalBackend(worker_backend, store, state.domain, recrawl_after=RECRAWL_AFTER)
         except Exception as e:
-            print(f" Error extracting buttons: {e}")
-        
+            errors.append(e)
+            return
+        started.append(worker_backend)
         try:
-            for a in driver.find_elements(By.TAG_NAME, "a"):
-                href = a.get_attribute("href")
-                text = a.text.strip()
-                
-                if not href:
-                    continue
-                
-                if href not in global_seen_hrefs:
-                    global_seen_hrefs.add(href)
-                    
-                    page_links.append({
-                        "text": text,
-                        "href": href
-                    })
-        except Exception as e:
-            print(f"Error extracting links: {e}")
+            crawl_worker(state, worker_backend, on_page)
+        finally:
+            worker_backend.close()
 
-        pages[current_url] = {
-            "inputs": page_inputs,
-            "buttons": page_buttons,
-            "links": page_links
-        }
-        
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_worker) for _ in range(workers)]
+        for future in futures:
+            future.result()
 
-        for link in page_links:
-            href = link["href"]
-            if href not in visited and urlparse(href).netloc == domain:
-                to_visit.append(href)
-        
-        page_count += 1
-    
-    driver.quit()
+    # Carry on with however many workers started; fail only if none did
+    if not started and errors:
+        raise errors[0]
     
-    print(f"\n Extraction complete: {len(pages)} pages")
+    print(f"\n Extraction complete: {len(state.pages)} pages")
     
 
-    return {
+    web_data = {
         "basic_info": {
             "url": start_url,
             "title": "Web Application",
-            "pages_crawled": len(pages)
+            "pages_crawled": len(state.pages)
         },
-        "pages": pages
+        "pages": state.pages
     }
+    if state.clusters:
+        web_data["page_types"] = state.clusters.summary()
+        print(f" Page types: {len(web_data['page_types'])}")
+    if store is not None:
+        web_data["changes"] = summarize_changes(state, store)
+        counts = ", ".join(f"{len(urls)} {kind}" for kind, urls in web_data["changes"].items())
+        print(f" Changes since last crawl: {counts}")
+    return web_data
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
 
+def serve_directory(directory, port=0):
+    """Serve a directory over HTTP in a background thread, for local crawl testing
+    
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
 
 
 if __name__ == "__main__":
-    start_url = "https://demo.nopcommerce.com"
-    web_data = extract_website_data(start_url)
+    parser = argparse.ArgumentParser(description="Crawl a website and save its pages to clean_pages.json")
+    parser.add_argument("url", nargs="?", default="https://demo.nopcommerce.com")
+    parser.add_argument("--max-pages", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=EXTRACT_WORKERS)
+    parser.add_argument("--backend", choices=["browser", "http", "hybrid"], default=CRAWL_BACKEND)
+    parser.add_argument("--incremental", action="store_true", help=f"Detect changed pages using {CRAWL_STORE_PATH}")
+    parser.add_argument("--serve", metavar="DIR", help="Serve DIR on a local HTTP server and crawl it instead of url")
+    args = parser.parse_args()
+
+    server = None
+    start_url = args.url
+    if args.serve:
+        server, start_url = serve_directory(args.serve)
+
+    try:
+        web_data = extract_website_data(start_url, args.max_pages, args.workers, args.backend, incremental=args.incremental)
+    finally:
+        if server:
+            server.shutdown()
     
 
     with open("clean_pages.json", "w") as f:
@@ -0,0 +1,95 @@
+import heapq
+import itertools
+from urllib.parse import unquote_plus, urlparse, urlunparse
+
+# Query parameters that never change what a page renders
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Words in a link's URL or text that usually lead to forms worth testing
+FORM_KEYWORDS = (
+    "login", "log in", "signin", "sign in", "logon", "register", "signup", "sign up", "join",
+    "account", "profile", "password", "checkout", "cart", "basket", "search", "contact",
+    "subscribe", "newsletter", "apply", "booking", "book", "order", "payment", "form", "upload"
+)
+FORM_KEYWORD_SCORE = 3.0
+PARENT_INPUTS_SCORE = 1.0  # Pages linked from pages with inputs tend to be part of the same flow
+DEPTH_PENALTY = 0.5
+
+
+def _is_tracking(key):
+    key = unquote_plus(key).lower()
+    return key.startswith("utm_") or key in TRACKING_PARAMS
+
+
+def normalize_url(url):
+    """Canonical form of a URL for dedup
+
+    Lowercases scheme and host, drops default ports, the #fragment and
+    tracking parameters (utm_*, gclid, ...), sorts the remaining query
+    parameters and gives an empty path "/".
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    netloc = host
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parsed.port}"
+    if parsed.username:
+        netloc = f"{parsed.username}{':' + parsed.password if parsed.password else ''}@{netloc}"
+
+    # Filter and sort the raw "key=value" pairs so their encoding is left untouched
+    query = sorted(
+        pair for pair in parsed.query.split("&")
+        if pair and not _is_tracking(pair.split("=", 1)[0])
+    )
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, "&".join(query), ""))
+
+
+def score_link(link, parent_page=None, depth=0):
+    """Crawl priority of a link: form-like targets first, then shallow pages"""
+    target = f"{link.get('href') or ''} {link.get('text') or ''}".lower()
+    score = FORM_KEYWORD_SCORE if any(keyword in target for keyword in FORM_KEYWORDS) else 0.0
+    if parent_page and parent_page.get("inputs"):
+        score += PARENT_INPUTS_SCORE
+    return score - DEPTH_PENALTY * depth
+
+
+class Frontier:
+    """Max-priority queue of URLs to crawl with dedup on enqueue
+
+    URLs are normalized before the seen-set check, so fragment and
+    tracking-parameter variants are queued once. Equal scores pop in
+    insertion order (breadth first); with prioritize=False every score is
+    equal and the frontier is a plain FIFO. Not thread-safe on its own:
+    CrawlState calls it under its lock.
+    """
+
+    def __init__(self, prioritize=True):
+        self.prioritize = prioritize
+        self.heap = []
+        self.seen = set()
+        self.depths = {}
+        self.counter = itertools.count()
+
+    def push(self, url, score=0.0, depth=0):
+        """Queue a URL unless it (or a variant of it) was queued before"""
+        url = normalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.depths[url] = depth
+        heapq.heappush(self.heap, (-score if self.prioritize else 0.0, next(self.counter), url))
+        return True
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def depth(self, url):
+        return self.depths.get(url, 0)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
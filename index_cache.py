@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+CACHE_FORMAT_VERSION = 1
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, write):
+    """Write via a temp file + os.replace so concurrent readers never see partial files"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            write(file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CachedDocument:
+    """Extracted text, chunk offsets and optional embeddings for one PDF"""
+
+    def __init__(self, text: str, offsets: np.ndarray, embeddings: Optional[np.ndarray] = None):
+        self.text = text
+        self.offsets = offsets  # (n_chunks, 2) int64 [start, end) character offsets
+        self.embeddings = embeddings  # (n_chunks, dim) float32, memory-mapped when loaded
+
+    def iter_chunk_texts(self) -> Iterator[str]:
+        for start, end in self.offsets.tolist():
+            yield self.text[start:end]
+
+
+class IndexCache:
+    """Content-addressed on-disk cache of parsed and indexed PDFs
+
+    Entries are keyed by the sha256 of the PDF bytes plus the chunking
+    parameters (strategy and sizes), so they are shared across processes and survive restarts.
+    Each entry is a directory holding text.txt, offsets.npy and one
+    embeddings-<signature>.npy per embedding backend; the .npy files are
+    opened with mmap_mode='r'.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, digest: str, chunking: str) -> str:
+        """chunking is PDFProcessor.signature, e.g. 'fixed:10000:500'"""
+        raw = f"v{CACHE_FORMAT_VERSION}:{digest}:{chunking}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def load(self, key: str, embedder_signature: str = None) -> Optional[CachedDocument]:
+        """Return the cached document, or None on a miss"""
+        entry = self._entry_dir(key)
+        # meta.json is written last and marks the entry as complete
+        if not (entry / "meta.json").exists():
+            return None
+        try:
+            # Bytes as written: read_text() would translate \r and \r\n and shift every offset
+            text = (entry / "text.txt").read_bytes().decode('utf-8', errors='surrogatepass')
+            offsets = np.load(entry / "offsets.npy", mmap_mode='r')
+            embeddings = None
+            if embedder_signature:
+                embeddings_path = entry / f"embeddings-{embedder_signature}.npy"
+                if embeddings_path.exists():
+                    embeddings = np.load(embeddings_path, mmap_mode='r')
+            return CachedDocument(text, offsets, embeddings)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, document: CachedDocument, embedder_signature: str = None, meta: dict = None):
+        """Persist a document; existing text/offsets are left untouched"""
+        entry = self._entry_dir(key)
+        entry.mkdir(parents=True, exist_ok=True)
+
+        if not (entry / "meta.json").exists():
+            _atomic_write(entry / "text.txt", lambda f: f.write(document.text.encode('utf-8', errors='surrogatepass')))
+            offsets = np.ascontiguousarray(document.offsets, dtype=np.int64)
+            _atomic_write(entry / "offsets.npy", lambda f: np.save(f, offsets))
+            payload = dict(meta or {}, version=CACHE_FORMAT_VERSION, chars=len(document.text), chunks=len(offsets))
+            _atomic_write(entry / "meta.json", lambda f: f.write(json.dumps(payload).encode('utf-8')))
+
+        self.store_embeddings(key, document.embeddings, embedder_signature)
+
+    def store_embeddings(self, key: str, embeddings: Optional[np.ndarray], embedder_signature: str = None):
+        """Add embeddings for one backend to an existing entry"""
+        if embeddings is None or not embedder_signature:
+            return
+        entry = self._entry_dir(key)
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        _atomic_write(entry / f"embeddings-{embedder_signature}.npy", lambda f: np.save(f, matrix))
@@ -0,0 +1,386 @@
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(".jobs", "jobs.sqlite3"))
+UPLOAD_DIR = os.path.join(".jobs", "uploads")  # Uploaded PDFs, named by content hash
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Worker processes started by the app
+POLL_INTERVAL = 1.0  # Seconds an idle worker waits before checking the queue again
+STALE_CHECK_INTERVAL = 60  # Seconds between a worker's checks for jobs of dead workers
+STALE_AFTER = 15 * 60  # A running job without progress or heartbeat for this long is requeued
+HEARTBEAT_INTERVAL = 30  # Seconds between a busy worker's "still alive" updates
+
+# Progress range (percent) of each stage
+STAGES = {
+    "queued": (0, 0),
+    "crawl": (0, 35),
+    "knowledge_base": (35, 45),
+    "generate": (45, 95),
+    "save": (95, 100),
+}
+
+
+class JobLost(Exception):
+    """The job was requeued and claimed by another worker; this worker must stop writing to it"""
+
+
+class JobStore:
+    """SQLite-backed job queue shared by the app and the worker processes
+
+    Every call opens its own connection, so one store can be used from any
+    thread or process. claim() is atomic: each queued job runs once even
+    with several workers polling the same database. Workers pass their name
+    to update(), heartbeat(), finish() and fail(), which then only touch the
+    job while that worker still owns it and raise JobLost otherwise.
+    """
+
+    def __init__(self, path=JOBS_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    progress REAL NOT NULL,
+                    message TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def submit(self, params):
+        """Queue a job; returns its id"""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, stage, progress, message, params, created_at, updated_at) "
+                "VALUES (?, 'queued', 'queued', 0, 'Waiting for a worker', ?, ?, ?)",
+                (job_id, json.dumps(params), now, now)
+            )
+        return job_id
+
+    def claim(self, worker):
+        """Mark the oldest queued job as running for worker and return it, or None"""
+        while True:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status = 'queued'",
+                    (worker, now, now, row[0])
+                ).rowcount
+            if claimed:
+                return self.get(row[0])
+            # Another worker got there first; try the next job
+
+    def _update_owned(self, job_id, worker, assignments, values):
+        """UPDATE a job, restricted to the running job of worker when one is given"""
+        where = "id = ?"
+        params = list(values) + [job_id]
+        if worker is not None:
+            where += " AND worker = ? AND status = 'running'"
+            params.append(worker)
+        with self._connect() as conn:
+            updated = conn.execute(f"UPDATE jobs SET {assignments} WHERE {where}", params).rowcount
+        if worker is not None and not updated:
+            raise JobLost(f"Job {job_id} is no longer owned by {worker}")
+
+    def update(self, job_id, stage, fraction=0.0, message="", worker=None):
+        """Record progress: fraction (0-1) of stage done"""
+        low, high = STAGES[stage]
+        self._update_owned(
+            job_id, worker, "stage = ?, progress = ?, message = ?, updated_at = ?",
+            (stage, round(low + (high - low) * min(max(fraction, 0.0), 1.0), 1), message, time.time())
+        )
+
+    def heartbeat(self, job_id, worker):
+        """Mark a running job as alive without changing its progress"""
+        self._update_owned(job_id, worker, "updated_at = ?", (time.time(),))
+
+    def finish(self, job_id, result, worker=None):
+        now = time.time()
+        self._update_owned(
+            job_id, worker,
+            "status = 'done', stage = 'save', progress = 100, message = 'Done', result = ?, updated_at = ?, finished_at = ?",
+            (json.dumps(result), now, now)
+        )
+
+    def fail(self, job_id, error, worker=None):
+        now = time.time()
+        self._update_owned(
+            job_id, worker,
+            "status = 'failed', message = 'Failed', error = ?, updated_at = ?, finished_at = ?",
+            (error, now, now)
+        )
+
+    def get(self, job_id, with_result=True):
+        """Job as a dict (params and result decoded), or None"""
+        columns = "id, status, stage, progress, message, params, error, worker, created_at, started_at, updated_at, finished_at"
+        if with_result:
+            columns += ", result"
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        if with_result:
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def queue_position(self, job_id):
+        """Queued jobs ahead of job_id"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' "
+                "AND created_at < (SELECT created_at FROM jobs WHERE id = ?)",
+                (job_id,)
+            ).fetchone()[0]
+
+    def requeue_stale(self, stale_after=STALE_AFTER):
+        """Put running jobs whose worker stopped reporting back in the queue"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, "
+                "message = 'Requeued after worker stopped', worker = NULL "
+                "WHERE status = 'running' AND updated_at < ?",
+                (time.time() - stale_after,)
+            ).rowcount
+
+
+# Per-process state of a worker, reused across its jobs
+_driver_pool = None
+
+
+def _get_driver_pool():
+    global _driver_pool
+    if _driver_pool is None:
+        from crawl_backends import create_driver_pool
+        _driver_pool = create_driver_pool(max_size=4)
+    return _driver_pool
+
+
+def run_job(store, job):
+    """Crawl and generate for one job, reporting progress per stage
+
+    A heartbeat thread keeps the job's updated_at fresh during stages that
+    report no progress (suites), so requeue_stale() only picks up jobs whose
+    worker is gone. If the job was requeued anyway and another worker owns
+    it now, progress writes stop and JobLost is raised at the next stage.
+    """
+    job_id = job["id"]
+    params = job["params"]
+    url = params["url"]
+    worker = job.get("worker")
+    lost = threading.Event()
+    stop = threading.Event()
+
+    def report(stage, fraction, message):
+        if lost.is_set():
+            return
+        try:
+            store.update(job_id, stage, fraction, message, worker=worker)
+        except JobLost:
+            lost.set()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                store.heartbeat(job_id, worker)
+            except JobLost:
+                lost.set()
+                return
+
+    def check():
+        if lost.is_set():
+            raise JobLost(f"Job {job_id} was taken over by another worker")
+
+    threading.Thread(target=heartbeat, name=f"heartbeat-{job_id}", daemon=True).start()
+    try:
+        _run_stages(store, job_id, params, url, worker, report, check)
+    finally:
+        stop.set()
+
+
+def _run_stages(store, job_id, params, url, worker, report, check):
+    """run_job's stages; report(stage, fraction, message) records progress, check() raises JobLost"""
+    from extract import extract_website_data
+
+    report("crawl", 0, f"Crawling {url}")
+    backend = params.get("backend")
+    web_data = extract_website_data(
+        url,
+        params.get("max_pages", 6),
+        workers=params.get("crawl_workers"),
+        backend=backend,
+        driver_pool=None if backend == "http" else _get_driver_pool(),
+        incremental=params.get("incremental", False),
+        on_page=lambda count, total, page_url: report("crawl", count / total, f"Crawled {count}/{total}: {page_url}")
+    )
+    if not web_data["pages"]:
+        raise RuntimeError(f"No pages could be crawled from {url}")
+
+    check()
+    report("knowledge_base", 0, "Loading AI model and documentation")
+    from rag import get_generator
+    generator = get_generator(params.get("pdf_paths"))
+    per_page = params.get("per_page", False)
+
+    received = []
+    if per_page:
+        expected = max(1, len(web_data["pages"]) * generator.config.CASES_PER_PAGE)
+    else:
+        expected = generator.config.MIN_TEST_CASES
+
+    def on_test_case(case):
+        received.append(case)
+        report("generate", len(received) / expected, f"Received {len(received)} test cases")
+
+    check()
+    report("generate", 0, "Generating test cases and suites")
+    results = generator.generate_all_tests(web_data, params.get("user_stories"), on_test_case=on_test_case, per_page=per_page)
+
+    check()
+    report("save", 0, "Saving results")
+    from case_store import CaseStore
+    CaseStore().add(results, site=url)
+    store.finish(job_id, results, worker=worker)
+
+
+def worker_main(db_path=JOBS_DB_PATH, worker=None, poll_interval=POLL_INTERVAL):
+    """Run queued jobs one at a time until the process is stopped
+
+    Between jobs the worker also requeues jobs whose worker stopped
+    reporting, so a worker dying while the app runs doesn't strand its job.
+    """
+    # The pid keeps names unique when several pools share a database
+    worker = f"{worker or 'worker'}-{os.getpid()}"
+    store = JobStore(db_path)
+    print(f"{worker} waiting for jobs in {db_path}")
+    last_stale_check = 0.0
+    while True:
+        if time.monotonic() - last_stale_check >= STALE_CHECK_INTERVAL:
+            requeued = store.requeue_stale()
+            if requeued:
+                print(f"{worker} requeued {requeued} stale jobs")
+            last_stale_check = time.monotonic()
+        job = store.claim(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        print(f"{worker} started job {job['id']}: {job['params'].get('url')}")
+        try:
+            run_job(store, job)
+            print(f"{worker} finished job {job['id']}")
+        except JobLost as e:
+            print(f"{worker} stopped job {job['id']}: {e}")
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                store.fail(job["id"], str(e), worker=worker)
+            except JobLost:
+                pass
+
+
+class WorkerPool:
+    """Worker processes running `python jobs.py worker`, stopped when this process exits"""
+
+    def __init__(self, workers=JOB_WORKERS, db_path=JOBS_DB_PATH):
+        self.workers = workers
+        self.db_path = db_path
+        self.processes = []
+        self.lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def start(self):
+        JobStore(self.db_path).requeue_stale()
+        script = os.path.abspath(__file__)
+        with self.lock:
+            self.processes = [p for p in self.processes if p.poll() is None]
+            for i in range(len(self.processes), self.workers):
+                self.processes.append(subprocess.Popen(
+                    [sys.executable, "-u", script, "worker", "--db", os.path.abspath(self.db_path), "--name", f"worker-{i + 1}"],
+                    cwd=os.path.dirname(script)
+                ))
+        return self
+
+    def alive(self):
+        with self.lock:
+            return sum(1 for p in self.processes if p.poll() is None)
+
+    def stop(self):
+        with self.lock:
+            for p in self.processes:
+                if p.poll() is None:
+                    p.terminate()
+            for p in self.processes:
+                try:
+                    p.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    p.kill()
+            self.processes = []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background test generation jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker_cmd = commands.add_parser("worker", help="Run one worker process")
+    worker_cmd.add_argument("--db", default=JOBS_DB_PATH)
+    worker_cmd.add_argument("--name")
+    pool_cmd = commands.add_parser("pool", help="Run several worker processes until interrupted")
+    pool_cmd.add_argument("--db", default=JOBS_DB_PATH)
+    pool_cmd.add_argument("--workers", type=int, default=JOB_WORKERS)
+    status_cmd = commands.add_parser("status", help="Print a job's status")
+    status_cmd.add_argument("job_id")
+    status_cmd.add_argument("--db", default=JOBS_DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        worker_main(args.db, args.name)
+    elif args.command == "pool":
+        pool = WorkerPool(args.workers, args.db).start()
+        try:
+            while pool.alive():
+                time.sleep(5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.stop()
+    else:
+        job = JobStore(args.db).get(args.job_id, with_result=False)
+        print(json.dumps(job, indent=2) if job else f"No job {args.job_id}")
@@ -0,0 +1,125 @@
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class JSONItemParser:
+    """Incremental parser for the objects of one JSON array in model output
+
+    feed() takes text as it arrives and returns every array element object
+    completed so far. The array is the value of key (e.g. "test_cases"), or
+    a top-level array; with key=None it is the first array found. Parsing
+    starts only where JSON can start, at '{"' or '[{' (whitespace allowed
+    in between), so prose such as "Here are [4] tests:" or ``` fences are
+    skipped. If the JSON value found ends without yielding any element
+    (a stray object in prose, an empty or unrelated array), the parser goes
+    back to scanning for the next start. Whatever follows an unfinished
+    element is simply never returned, so a truncated response still yields
+    every element that was complete.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.done = False
+        self.pending = None  # Opening bracket waiting for its next non-space character
+        self._reset()
+
+    def _reset(self):
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_chars = []
+        self.last_string = None
+        self.last_key = None
+        self.array_depth = None
+        self.item = None  # Characters of the element being read
+        self.found = 0  # Elements returned from the current array
+
+    def feed(self, text: str) -> List[Dict]:
+        items = []
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                if self.pending is None:
+                    if ch in "[{":
+                        self.pending = ch
+                    continue
+                if ch.isspace():
+                    continue
+                opener, self.pending = self.pending, None
+                if (opener, ch) not in (("{", '"'), ("[", "{")):
+                    if ch in "[{":
+                        self.pending = ch
+                    continue
+                self.started = True
+                self._step(opener, items)
+            self._step(ch, items)
+        return items
+
+    def _step(self, ch: str, items: List[Dict]):
+        if self.item is not None:
+            self.item.append(ch)
+
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif ch == "\\":
+                self.escape = True
+            elif ch == '"':
+                self.in_string = False
+                self.last_string = "".join(self.string_chars)
+            else:
+                self.string_chars.append(ch)
+            return
+
+        if ch == '"':
+            self.in_string = True
+            self.string_chars = []
+        elif ch == ":":
+            self.last_key = self.last_string
+        elif ch == ",":
+            self.last_key = None
+        elif ch in "[{":
+            self.depth += 1
+            if ch == "[" and self.array_depth is None and (
+                self.key is None or self.depth == 1 or self.last_key == self.key
+            ):
+                self.array_depth = self.depth
+            elif ch == "{" and self.array_depth is not None and self.depth == self.array_depth + 1:
+                self.item = ["{"]
+            self.last_key = None
+        elif ch in "]}":
+            if ch == "}" and self.item is not None and self.depth == self.array_depth + 1:
+                try:
+                    items.append(json.loads("".join(self.item)))
+                    self.found += 1
+                except ValueError:
+                    pass
+                self.item = None
+            self.depth -= 1
+            array_closed = self.array_depth is not None and self.depth < self.array_depth
+            if array_closed and self.found:
+                self.done = True
+            elif array_closed or self.depth == 0:
+                # Nothing came out of this value; look for the next one
+                self._reset()
+
+
+def iter_json_items(chunks: Iterable[str], key: Optional[str] = None) -> Iterator[Dict]:
+    """Yield array element objects from a stream of text chunks as each completes"""
+    parser = JSONItemParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+
+def parse_json_items(text: str, key: Optional[str] = None) -> List[Dict]:
+    """All complete array element objects in a full (possibly truncated) response"""
+    return JSONItemParser(key).feed(text)
+
+
+def parse_json_array(text: str, key: Optional[str] = None) -> Tuple[List[Dict], bool]:
+    """parse_json_items plus whether the array was closed (False for a cut-off response)"""
+    parser = JSONItemParser(key)
+    items = parser.feed(text)
+    return items, parser.done
@@ -0,0 +1,250 @@
+import asyncio
+import queue
+import random
+import threading
+import time
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_END = object()
+
+# One background event loop for every client, and the limits shared by
+# clients with the same limit_key: {limit_key: (TokenBucket, Semaphore)}
+_loop = None
+_loop_lock = threading.Lock()
+_shared_limits = {}
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-client", daemon=True).start()
+        return _loop
+
+
+class TokenBucket:
+    """Async token bucket: rate tokens per second, bursts of up to capacity"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+def is_retryable(error):
+    """Timeouts, 429 and 5xx responses (google.api_core errors carry .code)"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    try:
+        return int(code) in RETRYABLE_STATUS
+    except (TypeError, ValueError):
+        return False
+
+
+class LLMClient:
+    """Rate-limited, retrying async front end for a GenerativeModel
+
+    Every call takes a token from a bucket refilled at requests_per_minute,
+    holds one of max_in_flight slots, and is abandoned after timeout
+    seconds. Timeouts, 429s and 5xx errors are retried up to max_retries
+    times with full-jitter exponential backoff; anything else, or the last
+    failure, is raised. Models without generate_content_async (such as a
+    local stub) are called in a worker thread; a thread can't be cancelled,
+    so after a timeout its slot stays taken until the thread returns.
+
+    All clients run their calls, including generate_text() from plain
+    threads, on one background event loop. Clients created with the same
+    limit_key (e.g. the model name) share one bucket and one set of slots,
+    sized by the first of them, so several generators in a process stay
+    within one quota together; without a limit_key a client has its own.
+    """
+
+    def __init__(self, model, requests_per_minute=60, burst=None, max_in_flight=5, timeout=120.0,
+                 max_retries=4, base_delay=1.0, max_delay=30.0, limit_key=None):
+        self.model = model
+        self.limit_key = limit_key
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, min(max_in_flight, requests_per_minute))
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        loop = _get_loop()
+        with self._ready_lock:
+            if not self._ready:
+                # Loop-bound primitives are created on the loop that uses them
+                asyncio.run_coroutine_threadsafe(self._init_limits(), loop).result()
+                self._ready = True
+        return loop
+
+    async def _init_limits(self):
+        # Runs on the shared loop, so checking and filling the registry can't race
+        if self.limit_key is not None and self.limit_key in _shared_limits:
+            self.bucket, self.slots = _shared_limits[self.limit_key]
+            return
+        self.bucket = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+        if self.limit_key is not None:
+            _shared_limits[self.limit_key] = (self.bucket, self.slots)
+
+    async def _in_thread(self, fn, last_activity=None):
+        """Run fn in a worker thread within timeout, holding a slot until the thread returns
+
+        With last_activity (a callable returning a time.monotonic() value)
+        the timeout counts from the thread's start or its latest activity,
+        whichever is later, instead of capping the whole call.
+        """
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+
+        def run():
+            try:
+                return fn()
+            finally:
+                loop.call_soon_threadsafe(self.slots.release)
+
+        try:
+            future = loop.run_in_executor(None, run)
+        except BaseException:
+            self.slots.release()
+            raise
+        if last_activity is None:
+            return await asyncio.wait_for(future, self.timeout)
+        started = time.monotonic()
+        while True:
+            remaining = max(started, last_activity()) + self.timeout - time.monotonic()
+            if remaining <= 0:
+                future.cancel()
+                raise TimeoutError(f"No response data for {self.timeout}s")
+            done, _ = await asyncio.wait({future}, timeout=remaining)
+            if done:
+                return future.result()
+
+    async def _call(self, prompt):
+        self.stats["calls"] += 1
+        if hasattr(self.model, "generate_content_async"):
+            async with self.slots:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt, request_options={"timeout": self.timeout}),
+                    self.timeout
+                )
+            return response.text
+        return await self._in_thread(lambda: self.model.generate_content(prompt).text)
+
+    def backoff(self, attempt):
+        """Full jitter: uniform in [0, min(max_delay, base_delay * 2**attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _generate(self, prompt):
+        attempt = 0
+        while True:
+            self.stats["throttled_seconds"] += await self.bucket.acquire()
+            try:
+                return await self._call(prompt)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self.backoff(attempt)
+                attempt += 1
+                self.stats["retries"] += 1
+                print(f"    Model call failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def generate(self, prompt):
+        """Response text for one prompt; awaitable from any event loop"""
+        future = asyncio.run_coroutine_threadsafe(self._generate(prompt), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def generate_many(self, prompts, return_exceptions=False):
+        """Response texts for several prompts, sent concurrently within the limits"""
+        return await asyncio.gather(*(self.generate(p) for p in prompts), return_exceptions=return_exceptions)
+
+    def _pump(self, prompt, chunks, sent, cancelled, activity):
+        """Read a streamed response in a worker thread, forwarding text chunks"""
+        response = self.model.generate_content(prompt, stream=True)
+        parts = response if hasattr(response, "__iter__") else [response]  # Stubs may not stream
+        for part in parts:
+            if cancelled.is_set():
+                return
+            activity[0] = time.monotonic()
+            text = part.text
+            if text:
+                sent[0] = True
+                chunks.put(text)
+
+    async def _stream(self, prompt, chunks):
+        attempt = 0
+        sent = [False]
+        activity = [0.0]  # When the last chunk arrived
+        try:
+            while True:
+                cancelled = threading.Event()
+                self.stats["throttled_seconds"] += await self.bucket.acquire()
+                try:
+                    self.stats["calls"] += 1
+                    # The timeout covers the wait for the first chunk and each gap between chunks
+                    await self._in_thread(lambda: self._pump(prompt, chunks, sent, cancelled, activity),
+                                          last_activity=lambda: activity[0])
+                    return
+                except Exception as e:
+                    cancelled.set()
+                    # Once text has been handed out a retry would repeat it
+                    if sent[0] or attempt >= self.max_retries or not is_retryable(e):
+                        self.stats["failures"] += 1
+                        raise
+                    delay = self.backoff(attempt)
+                    attempt += 1
+                    self.stats["retries"] += 1
+                    print(f"    Model call failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        finally:
+            chunks.put(_END)
+
+    def stream_text(self, prompt):
+        """Blocking iterator over response text chunks as they arrive
+
+        Same limits as generate(), except that timeout applies to the wait
+        for the first chunk and to each gap between chunks, so a long
+        response that keeps arriving is never cut off. A failed call is
+        retried only until the first chunk has been yielded, after that the
+        error is raised to the caller, which keeps whatever it already
+        received.
+        """
+        chunks = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._stream(prompt, chunks), self._ensure_loop())
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                break
+            yield chunk
+        future.result()
+
+    def generate_text(self, prompt):
+        """Blocking generate() for synchronous callers and worker threads"""
+        return asyncio.run_coroutine_threadsafe(self._generate(prompt), self._ensure_loop()).result()
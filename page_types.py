@@ -0,0 +1,127 @@
+import hashlib
+import json
+import math
+import re
+from urllib.parse import urlparse
+
+# Numbers (42, 42.html), long hex ids, UUIDs and segments carrying a 3+ digit
+# number (item-12345); version-like segments such as v2 or p2.html stay literal
+ID_SEGMENT = re.compile(r"^\d+(\.\w+)?$|^[0-9a-f]{8,}$|^[0-9a-f-]{36}$|^[\w.-]*\d{3,}[\w.-]*$", re.IGNORECASE)
+DIGITS = re.compile(r"\d+")
+
+
+def url_pattern(url):
+    """Template-ish shape of a URL: /product/123?color=red -> /product/{id}?color=*
+
+    Numeric and id-like segments become {id}; segments of three or more
+    hyphenated words (product/article slugs) become {slug}; query values
+    become *.
+    """
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split("/"):
+        if segment and ID_SEGMENT.match(segment):
+            segments.append("{id}")
+        elif segment.count("-") >= 2:
+            segments.append("{slug}")
+        else:
+            segments.append(segment)
+    pattern = "/".join(segments) or "/"
+    if parsed.query:
+        keys = sorted({pair.split("=", 1)[0] for pair in parsed.query.split("&") if pair})
+        pattern += "?" + "&".join(f"{key}=*" for key in keys)
+    return pattern
+
+
+def is_generic(pattern):
+    """Whether a pattern can match more than one URL"""
+    return "{id}" in pattern or "{slug}" in pattern or "=*" in pattern
+
+
+def dom_signature(elements):
+    """Hash of a page's form structure, ignoring ids and per-item text
+
+    Built from the raw (pre-dedup) input names/types and button types/texts
+    with digits masked, plus the order of magnitude of the link count.
+    Returns None for pages without inputs or buttons, which have too little
+    structure to tell templates apart.
+    """
+    inputs = sorted({(DIGITS.sub("#", i.get("name") or ""), i.get("type") or "") for i in elements.get("inputs", [])})
+    buttons = sorted({(DIGITS.sub("#", (b.get("text") or "").lower()), b.get("type") or "") for b in elements.get("buttons", [])})
+    if not inputs and not buttons:
+        return None
+    links = len(elements.get("links", []))
+    payload = json.dumps([inputs, buttons, int(math.log2(links + 1))])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class TemplateClusters:
+    """Group crawled pages into page types and cap how far each is crawled
+
+    A page's type is its URL pattern together with its DOM signature, so
+    unrelated pages that share a layout (a header search form on about,
+    shipping and careers pages) stay separate types. Only types with a
+    generic URL pattern (/product/{id}) are capped: once one has limit pages,
+    further pages of it are recorded but their links aren't followed.
+    Queued URLs are skipped without being fetched only when their generic
+    URL pattern already has limit pages that all share one DOM signature,
+    so a pattern that merely looks generic (flat slugs of unrelated pages)
+    is still crawled. Not thread-safe on its own: CrawlState calls it under
+    its lock.
+    """
+
+    def __init__(self, limit=3):
+        self.limit = limit
+        self.types = {}  # cluster key -> page type record
+        self.pattern_pages = {}  # URL pattern -> pages recorded with it
+        self.pattern_types = {}  # URL pattern -> page type id of its first page
+        self.pattern_keys = {}  # URL pattern -> cluster keys (pattern, signature) of its pages
+        self.skipped = {}  # URL pattern -> queued URLs not fetched
+
+    def allow(self, url):
+        """Whether a queued URL is still worth fetching"""
+        pattern = url_pattern(url)
+        keys = self.pattern_keys.get(pattern, set())
+        single_template = len(keys) == 1 and next(iter(keys))[1] is not None
+        if is_generic(pattern) and single_template and self.pattern_pages.get(pattern, 0) >= self.limit:
+            self.skipped[pattern] = self.skipped.get(pattern, 0) + 1
+            return False
+        return True
+
+    def assign(self, url, elements):
+        """Page type id of a crawled page, and whether to follow its links"""
+        pattern = url_pattern(url)
+        signature = dom_signature(elements)
+        key = (pattern, signature)
+        if key not in self.types:
+            self.types[key] = {
+                "id": f"type-{len(self.types) + 1}",
+                "signature": signature,
+                "generic": is_generic(pattern),
+                "url_patterns": set(),
+                "pages": []
+            }
+        page_type = self.types[key]
+        page_type["url_patterns"].add(pattern)
+        page_type["pages"].append(url)
+        self.pattern_pages[pattern] = self.pattern_pages.get(pattern, 0) + 1
+        self.pattern_types.setdefault(pattern, page_type["id"])
+        self.pattern_keys.setdefault(pattern, set()).add(key)
+        return page_type["id"], not page_type["generic"] or len(page_type["pages"]) <= self.limit
+
+    def summary(self):
+        """Page types for the crawl output, with the URLs skipped for each"""
+        skipped = {}
+        for pattern, count in self.skipped.items():
+            type_id = self.pattern_types.get(pattern)
+            skipped[type_id] = skipped.get(type_id, 0) + count
+        return [
+            {
+                "id": page_type["id"],
+                "url_patterns": sorted(page_type["url_patterns"]),
+                "pages": page_type["pages"],
+                "expanded": page_type["pages"][:self.limit] if page_type["generic"] else page_type["pages"],
+                "skipped_urls": skipped.get(page_type["id"], 0)
+            }
+            for page_type in self.types.values()
+        ]
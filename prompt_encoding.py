@@ -0,0 +1,189 @@
+import json
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+CHARS_PER_TOKEN = 4  # Rough English average, good enough for budgeting
+
+SKIPPED_SCHEMES = ("javascript:", "mailto:", "tel:", "data:")
+STATIC_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+    ".css", ".js", ".pdf", ".zip", ".mp4", ".mp3", ".woff", ".woff2"
+)
+CRAWL_METADATA_KEYS = ("changes", "page_types")  # Top-level web_data keys that never go into a prompt
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for chunk and prompt budgets"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def is_test_relevant_link(href: str, page_url: str, site_netloc: str) -> bool:
+    """Drop links a tester can't act on: fragments, scripts, assets and other sites"""
+    if not href or href.startswith("#") or href.lower().startswith(SKIPPED_SCHEMES):
+        return False
+    parsed = urlparse(href)
+    if parsed.netloc and parsed.netloc != site_netloc:
+        return False
+    if parsed.path.lower().endswith(STATIC_EXTENSIONS):
+        return False
+    # In-page anchors such as "https://site/#main"
+    if parsed.fragment and href.split("#", 1)[0].rstrip("/") == page_url.rstrip("/"):
+        return False
+    return True
+
+
+def _cell(value) -> str:
+    return str(value or "").replace("\r", " ").replace("\n", " ").replace("|", "\\|").strip()
+
+
+class UrlAliases:
+    """Replace repeated origins (scheme://host) with short @N aliases"""
+
+    def __init__(self):
+        self.aliases: Dict[str, str] = {}
+
+    def shorten(self, url: str) -> str:
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return url
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        alias = self.aliases.setdefault(origin, f"@{len(self.aliases)}")
+        return alias + url[len(origin):]
+
+    def legend(self) -> List[str]:
+        return [f"{alias}={origin}" for origin, alias in self.aliases.items()]
+
+
+def filter_web_data(web_data: Dict, drop_navigation: bool = True) -> Dict:
+    """Copy of web_data with only the page fields a prompt needs
+
+    Crawl bookkeeping such as per-page readiness timings, fingerprints, page
+    types and the incremental "changes" report is dropped, and with
+    drop_navigation so are links that aren't test-relevant.
+    """
+    site_netloc = urlparse(web_data.get("basic_info", {}).get("url", "")).netloc
+    pages = {}
+    for page_url, page in web_data.get("pages", {}).items():
+        links = page.get("links", [])
+        if drop_navigation:
+            links = [
+                link for link in links
+                if is_test_relevant_link(link.get("href", ""), page_url, site_netloc)
+            ]
+        pages[page_url] = {
+            "inputs": page.get("inputs", []),
+            "buttons": page.get("buttons", []),
+            "links": links
+        }
+    filtered = {k: v for k, v in web_data.items() if k not in CRAWL_METADATA_KEYS}
+    filtered["pages"] = pages
+    return filtered
+
+
+def encode_tabular(web_data: Dict) -> str:
+    """Pipe-separated tables per page with shared URL prefixes
+
+    Example:
+        SITE Web Application @0 (pages: 2)
+        URLS @0=https://example.com
+        PAGE @0/login
+        inputs name|type|placeholder
+        email|email|Your email
+        buttons text|type
+        Log in|submit
+        links text|href
+        Register|@0/register
+    """
+    aliases = UrlAliases()
+    info = web_data.get("basic_info", {})
+    lines = [f"SITE {_cell(info.get('title'))} {aliases.shorten(info.get('url', ''))} (pages: {info.get('pages_crawled', len(web_data.get('pages', {})))})"]
+
+    body = []
+    for page_url, page in web_data.get("pages", {}).items():
+        body.append(f"PAGE {aliases.shorten(page_url)}")
+        if page.get("inputs"):
+            body.append("inputs name|type|placeholder")
+            body.extend(f"{_cell(i.get('name'))}|{_cell(i.get('type'))}|{_cell(i.get('placeholder'))}" for i in page["inputs"])
+        if page.get("buttons"):
+            body.append("buttons text|type")
+            body.extend(f"{_cell(b.get('text'))}|{_cell(b.get('type'))}" for b in page["buttons"])
+        if page.get("links"):
+            body.append("links text|href")
+            body.extend(f"{_cell(l.get('text'))}|{_cell(aliases.shorten(l.get('href', '')))}" for l in page["links"])
+
+    extra = {k: v for k, v in web_data.items() if k not in ("basic_info", "pages")}
+    if extra:
+        body.append("EXTRA " + json.dumps(extra, separators=(",", ":"), ensure_ascii=False))
+
+    lines.append("URLS " + " ".join(aliases.legend()))
+    return "\n".join(lines + body)
+
+
+def encode_json(web_data: Dict) -> str:
+    """Minified JSON"""
+    return json.dumps(web_data, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_raw(web_data: Dict) -> str:
+    """The original pretty-printed JSON"""
+    return json.dumps(web_data, indent=2)
+
+
+ENCODERS = {
+    "tabular": encode_tabular,
+    "json": encode_json,
+    "raw": encode_raw,
+}
+
+FORMAT_NOTES = {
+    "tabular": "Website data (one PAGE block per page; rows are pipe-separated; @N/ is shorthand for the URL in the URLS line):",
+    "json": "Website data (JSON):",
+    "raw": "",
+}
+
+
+class WebDataEncoder:
+    """Encode web_data for prompts and report size before/after to hooks
+
+    Hooks are called with (label, stats) where stats holds raw_chars,
+    encoded_chars, raw_tokens, encoded_tokens and ratio. The raw size is
+    only computed when at least one hook is registered.
+    """
+
+    def __init__(self, fmt: str = "tabular", drop_navigation: bool = True):
+        if fmt not in ENCODERS:
+            raise ValueError(f"Unknown web data format: {fmt}")
+        self.fmt = fmt
+        self.drop_navigation = drop_navigation
+        self.hooks: List[Callable[[str, Dict], None]] = []
+
+    def add_hook(self, hook: Callable[[str, Dict], None]):
+        self.hooks.append(hook)
+
+    def encode(self, web_data: Optional[Dict], label: str = "web_data") -> str:
+        if not web_data:
+            return "(no website data)"
+        if self.fmt == "raw":
+            encoded = encode_raw(web_data)
+        else:
+            encoded = ENCODERS[self.fmt](filter_web_data(web_data, self.drop_navigation))
+        if FORMAT_NOTES[self.fmt]:
+            encoded = f"{FORMAT_NOTES[self.fmt]}\n{encoded}"
+        if self.hooks:
+            raw = encode_raw(web_data)
+            stats = {
+                "raw_chars": len(raw),
+                "encoded_chars": len(encoded),
+                "raw_tokens": estimate_tokens(raw),
+                "encoded_tokens": estimate_tokens(encoded),
+                "ratio": round(len(encoded) / max(len(raw), 1), 3),
+            }
+            for hook in self.hooks:
+                hook(label, stats)
+        return encoded
+
+
+def print_prompt_size(label: str, stats: Dict):
+    """Hook that logs prompt size savings"""
+    print(f"    {label}: {stats['raw_tokens']} -> {stats['encoded_tokens']} est. tokens ({stats['ratio']:.0%} of original)")
@@ -1,11 +1,24 @@
 import json
 import google.generativeai as genai
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 import re
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
+import numpy as np
 from dotenv import load_dotenv
+from embeddings import Embedder, VectorIndex, get_embedder
+from index_cache import CachedDocument, IndexCache, file_digest
+from response_cache import build_response_cache, cache_key
+from prompt_encoding import CHARS_PER_TOKEN, WebDataEncoder, estimate_tokens, print_prompt_size
+from crawl_store import page_fingerprint
+from llm_client import LLMClient
+from json_stream import JSONItemParser, parse_json_array, parse_json_items
+import hashlib
+import threading
 load_dotenv()
 
 class Config:
@@ -15,62 +28,368 @@ class Config:
     MIN_TEST_CASES = 20
     CHUNK_SIZE = 10000  # Characters per chunk
     CHUNK_OVERLAP = 500  # Overlap between chunks
+    CONCURRENT_GENERATION = True  # Send main + suite prompts at once
+    MAX_CONCURRENT_REQUESTS = 5  # Upper bound on in-flight model calls
+    REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_RPM", "10"))  # Model quota; shared by every generator using the model in this process
+    REQUEST_TIMEOUT = 120  # Seconds before a model call is cancelled and retried
+    MAX_RETRIES = 4  # Retries on timeouts, 429 and 5xx, with jittered exponential backoff
+    STREAM_RESPONSES = True  # Stream the main response and parse test cases as they complete
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")  # "hashing" (offline) or "gemini"
+    INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", ".index_cache")  # Empty string disables the cache
+    CHUNK_STRATEGY = "structured"  # "structured" (paragraph/heading aware) or "fixed" (CHUNK_SIZE chars)
+    CHUNK_TOKENS = 500  # Token budget per structured chunk
+    CHUNK_OVERLAP_TOKENS = 50  # Trailing sentences carried into the next structured chunk
+    CONTEXT_CANDIDATES = 8  # Chunks retrieved before packing the prompt context
+    MAIN_CONTEXT_TOKENS = 1250  # Reference documentation budget for the main prompt
+    SUITE_CONTEXT_TOKENS = 750  # Reference documentation budget for each suite prompt
+    WEB_DATA_FORMAT = "tabular"  # How web_data is embedded in prompts: "tabular", "json" (minified) or "raw"
+    DROP_NAVIGATION_LINKS = True  # Leave fragment, asset and off-site links out of prompts
+    LOG_PROMPT_SIZES = False  # Print web_data size before/after encoding for every prompt
+    RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "tiered")  # "tiered" (memory + SQLite), "memory", "sqlite" or "" to disable
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", ".response_cache.sqlite3")
+    RESPONSE_CACHE_TTL = 7 * 24 * 3600  # Seconds; None keeps responses until evicted by size
+    RESPONSE_CACHE_MAX_ENTRIES = 5000
+    RESPONSE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+    PARALLEL_EXTRACT_MIN_PAGES = 100  # Use a process pool for PDFs at least this long
+    PAGES_PER_TASK = 25  # Page range handed to each extraction worker
+    PER_PAGE_GENERATION = False  # Prompt once per crawled page and cache the tests by page fingerprint
+    CASES_PER_PAGE = 6  # Main test cases requested for each page in per-page mode
+    PAGE_CONTEXT_TOKENS = 500  # Reference documentation budget for each page prompt
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+NUMBERED_HEADING = re.compile(r'^(?:\d+(?:\.\d+)*\.?|[IVXLC]+\.|(?:chapter|section|appendix)\b)\s*\S', re.IGNORECASE)
+CAPS_HEADING = re.compile(r'^[A-Z][A-Z0-9 ,:&/()\-]{3,}$')
+
+def is_heading(line: str) -> bool:
+    """Short numbered or all-caps lines that don't end a sentence"""
+    if not line or len(line) > 80 or line[-1] in ".,;":
+        return False
+    return bool(NUMBERED_HEADING.match(line) or CAPS_HEADING.match(line))
+
+def pack_context(chunks: List["Chunk"], max_tokens: int) -> str:
+    """Pack whole chunks, best first, into at most max_tokens
+    
+    Chunks that don't fit are skipped in favour of later, smaller ones. If
+    not even the best chunk fits, it is cut at its last sentence boundary
+    inside the budget so the prompt never ends mid-sentence.
+    """
+    parts = []
+    used = 0
+    separator = estimate_tokens("\n\n")
+    for chunk in chunks:
+        text = chunk.text.strip()
+        cost = estimate_tokens(text) + (separator if parts else 0)
+        if text and used + cost <= max_tokens:
+            parts.append(text)
+            used += cost
+    
+    if not parts and chunks:
+        text = chunks[0].text.strip()[:max_tokens * CHARS_PER_TOKEN]
+        cut = max((m.start() for m in SENTENCE_END.finditer(text)), default=0)
+        parts.append(text[:cut] if cut else text)
+    
+    return "\n\n".join(parts)
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) in a worker process"""
+    import PyPDF2
+    
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(pdf_reader.pages[i].extract_text() or "") + "\n" for i in range(start, stop)]
 
 class PDFProcessor:
     """Handle PDF loading and chunking"""
     
-    def __init__(self, chunk_size: int = 10000, chunk_overlap: int = 500):
+    def __init__(self, chunk_size: int = 10000, chunk_overlap: int = 500, strategy: str = "fixed",
+                 chunk_tokens: int = 500, overlap_tokens: int = 50):
+        if strategy not in ("fixed", "structured"):
+            raise ValueError(f"Unknown chunk strategy: {strategy}")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.strategy = strategy
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
     
-    def load_pdf(self, pdf_path: str) -> str:
-        """Load PDF and extract text using PyPDF2"""
+    @property
+    def signature(self) -> str:
+        """Chunking parameters, used to key cached indexes"""
+        if self.strategy == "structured":
+            return f"structured:{self.chunk_tokens}:{self.overlap_tokens}"
+        return f"fixed:{self.chunk_size}:{self.chunk_overlap}"
+    
+    def iter_pages(self, pdf_path: str, workers: int = None) -> Iterator[str]:
+        """Yield each page's text (newline-terminated) as it is extracted
+        
+        PDFs with at least Config.PARALLEL_EXTRACT_MIN_PAGES pages are split
+        into page ranges and extracted by a process pool; pages are still
+        yielded in document order.
+        """
         try:
             import PyPDF2
             
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                page_count = len(pdf_reader.pages)
+                workers = workers or os.cpu_count() or 1
+                
+                if workers <= 1 or page_count < Config.PARALLEL_EXTRACT_MIN_PAGES:
+                    for page in pdf_reader.pages:
+                        yield (page.extract_text() or "") + "\n"
+                    return
+            
+            yield from self._iter_pages_parallel(pdf_path, page_count, workers)
         except ImportError:
             raise ImportError("PyPDF2 not installed. Run: pip install PyPDF2")
         except Exception as e:
             raise Exception(f"Error loading PDF: {str(e)}")
     
+    def _iter_pages_parallel(self, pdf_path: str, page_count: int, workers: int) -> Iterator[str]:
+        """Extract page ranges in a process pool, keeping at most 2 ranges per worker in flight"""
+        ranges = (
+            (start, min(start + Config.PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, Config.PAGES_PER_TASK)
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                executor.submit(_extract_page_range, pdf_path, start, stop)
+                for start, stop in islice(ranges, workers * 2)
+            )
+            while pending:
+                pages = pending.popleft().result()
+                for start, stop in islice(ranges, 1):
+                    pending.append(executor.submit(_extract_page_range, pdf_path, start, stop))
+                yield from pages
+    
+    def load_pdf(self, pdf_path: str) -> str:
+        """Load PDF and extract text using PyPDF2"""
+        return "".join(self.iter_pages(pdf_path))
+    
+    def chunk_offsets(self, text_length: int) -> np.ndarray:
+        """[start, end) character offsets of overlapping chunks"""
+        starts = np.arange(0, text_length, self.chunk_size - self.chunk_overlap, dtype=np.int64)
+        ends = np.minimum(starts + self.chunk_size, text_length)
+        return np.stack([starts, ends], axis=1)
+    
     def chunk_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
-        chunks = []
-        start = 0
-        text_length = len(text)
+        if self.strategy == "structured":
+            return [chunk for _, _, chunk in self.iter_chunks([text])]
+        return [text[start:end] for start, end in self.chunk_offsets(len(text)).tolist()]
+    
+    def iter_chunks(self, pieces: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+        """Chunk a stream of text pieces incrementally, yielding (start, end, chunk)"""
+        if self.strategy == "structured":
+            return self._iter_structured_chunks(pieces)
+        return self._iter_fixed_chunks(pieces)
+    
+    def _iter_fixed_chunks(self, pieces: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+        """Same boundaries chunk_offsets gives on the joined text, buffering about one chunk"""
+        step = self.chunk_size - self.chunk_overlap
+        buffer = ""
+        buffer_start = 0  # Absolute offset of buffer[0]
+        next_start = 0
+        
+        for piece in pieces:
+            buffer = buffer[next_start - buffer_start:] + piece
+            buffer_start = next_start
+            while len(buffer) - (next_start - buffer_start) >= self.chunk_size:
+                local = next_start - buffer_start
+                yield next_start, next_start + self.chunk_size, buffer[local:local + self.chunk_size]
+                next_start += step
         
-        while start < text_length:
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
+        text_length = buffer_start + len(buffer)
+        while next_start < text_length:
+            local = next_start - buffer_start
+            yield next_start, text_length, buffer[local:]
+            next_start += step
+    
+    def _segments(self, piece: str, base: int, max_chars: int) -> List[Tuple[int, int, str]]:
+        """Split a piece into contiguous (start, end, kind) segments
+        
+        kind is "heading" for heading lines, "para" for the first sentence of a
+        paragraph and "sent" otherwise. Segments longer than max_chars are
+        hard-wrapped at whitespace.
+        """
+        bounds = {0: "para"}
+        pos = 0
+        prev_break = True
+        for line in piece.splitlines(keepends=True):
+            stripped = line.strip()
+            heading = is_heading(stripped)
+            if heading:
+                bounds[pos] = "heading"
+            elif stripped and prev_break:
+                bounds[pos] = "para"
+            prev_break = not stripped or heading
+            pos += len(line)
+        for match in SENTENCE_END.finditer(piece):
+            bounds.setdefault(match.end(), "sent")
+        
+        positions = sorted(p for p in bounds if p < len(piece))
+        segments = []
+        for i, start in enumerate(positions):
+            end = positions[i + 1] if i + 1 < len(positions) else len(piece)
+            kind = bounds[start]
+            while end - start > max_chars:
+                cut = piece.rfind(" ", start + 1, start + max_chars)
+                cut = cut + 1 if cut > start else start + max_chars
+                segments.append((base + start, base + cut, kind))
+                start, kind = cut, "sent"
+            segments.append((base + start, base + end, kind))
+        return segments
+    
+    def _iter_structured_chunks(self, pieces: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+        """Greedy packing of sentence/paragraph/heading segments into token-budget chunks
+        
+        A chunk is closed before a heading (once it is a quarter full), before a
+        new paragraph (once it is three quarters full) or when the next segment
+        would overflow the budget. Up to overlap_tokens of trailing sentences
+        are repeated at the start of the next chunk within a section.
+        """
+        budget = self.chunk_tokens * CHARS_PER_TOKEN
+        overlap = self.overlap_tokens * CHARS_PER_TOKEN
+        buffer = ""
+        buffer_start = 0  # Absolute offset of buffer[0]
+        base = 0
+        current = []
+        
+        for piece in pieces:
+            buffer += piece
+            for start, end, kind in self._segments(piece, base, budget):
+                size = current[-1][1] - current[0][0] if current else 0
+                if current and (
+                    size + (end - start) > budget
+                    or (kind == "heading" and size >= budget // 4)
+                    or (kind == "para" and size >= budget * 3 // 4)
+                ):
+                    chunk_start, chunk_end = current[0][0], current[-1][1]
+                    yield chunk_start, chunk_end, buffer[chunk_start - buffer_start:chunk_end - buffer_start]
+                    
+                    carry = []
+                    if kind != "heading":
+                        for segment in reversed(current[1:]):
+                            if segment[2] == "heading" or chunk_end - segment[0] > overlap:
+                                break
+                            carry.insert(0, segment)
+                        if carry and end - carry[0][0] > budget:
+                            carry = []
+                    current = carry
+                    keep_from = current[0][0] if current else start
+                    buffer = buffer[keep_from - buffer_start:]
+                    buffer_start = keep_from
+                current.append((start, end, kind))
+            base += len(piece)
         
-        return chunks
+        if current:
+            chunk_start, chunk_end = current[0][0], current[-1][1]
+            yield chunk_start, chunk_end, buffer[chunk_start - buffer_start:chunk_end - buffer_start]
+
+class Chunk:
+    """A [start, end) view into a shared backing text; the text is sliced on demand"""
+    
+    __slots__ = ("source", "start", "end")
+    
+    def __init__(self, source: str, start: int, end: int):
+        self.source = source
+        self.start = start
+        self.end = end
+    
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+    
+    def __len__(self) -> int:
+        return self.end - self.start
+    
+    def __str__(self) -> str:
+        return self.text
+    
+    def __repr__(self) -> str:
+        return f"Chunk({self.start}, {self.end})"
+
+class ChunkStore:
+    """Compact chunk table: one backing string per document plus an int64 offset array
+    
+    Rows of `offsets` are [document, start, end). No chunk text is copied until
+    a Chunk's text is read, so overlaps and knowledge-base copies cost nothing.
+    """
+    
+    def __init__(self, buffers: List[str] = None, offsets: np.ndarray = None):
+        self.buffers = buffers or []
+        self.offsets = offsets if offsets is not None else np.empty((0, 3), dtype=np.int64)
+    
+    @classmethod
+    def from_texts(cls, texts: List[str]) -> "ChunkStore":
+        """Wrap already-materialized chunk strings, one buffer each"""
+        offsets = np.array([(i, 0, len(text)) for i, text in enumerate(texts)], dtype=np.int64)
+        return cls(list(texts), offsets.reshape(-1, 3))
+    
+    def add_document(self, text: str, offsets: np.ndarray):
+        """Append a document's (n, 2) [start, end) chunk offsets"""
+        rows = np.empty((len(offsets), 3), dtype=np.int64)
+        rows[:, 0] = len(self.buffers)
+        rows[:, 1:] = offsets
+        self.buffers.append(text)
+        self.offsets = np.concatenate([self.offsets, rows])
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def __getitem__(self, i: int) -> Chunk:
+        doc, start, end = self.offsets[i].tolist()
+        return Chunk(self.buffers[doc], start, end)
+    
+    def __iter__(self) -> Iterator[Chunk]:
+        for doc, start, end in self.offsets.tolist():
+            yield Chunk(self.buffers[doc], start, end)
+    
+    def iter_texts(self) -> Iterator[str]:
+        for chunk in self:
+            yield chunk.text
 
 class RAGRetriever:
-    """Simple RAG retriever using Gemini embeddings"""
+    """RAG retriever backed by an in-memory cosine vector index"""
     
-    def __init__(self, model: genai.GenerativeModel):
+    def __init__(self, model: genai.GenerativeModel, embedder: Embedder = None, batch_size: int = 64):
         self.model = model
-        self.chunks = []
-        self.chunk_embeddings = []
+        self.embedder = embedder or get_embedder(Config.EMBEDDING_BACKEND)
+        self.batch_size = batch_size
+        self.chunks = ChunkStore()
+        self.chunk_embeddings = np.empty((0, 0), dtype=np.float32)
+        self.index = VectorIndex()
+    
+    def embed_chunks(self, chunks: Iterable[str]) -> np.ndarray:
+        """Embed chunks in batches into a contiguous float32 matrix"""
+        chunks = iter(chunks)
+        batches = []
+        while True:
+            batch = list(islice(chunks, self.batch_size))
+            if not batch:
+                break
+            batches.append(self.embedder.embed(batch))
+        if not batches:
+            return np.empty((0, self.embedder.dim), dtype=np.float32)
+        return np.ascontiguousarray(np.vstack(batches), dtype=np.float32)
     
-    def index_documents(self, chunks: List[str]):
-        """Index document chunks (simplified - uses first few chunks)"""
+    def index_documents(self, chunks, embeddings: np.ndarray = None):
+        """Index a ChunkStore (or list of chunk strings), embedding it unless embeddings are given"""
+        if not isinstance(chunks, ChunkStore):
+            chunks = ChunkStore.from_texts(chunks)
         self.chunks = chunks
+        if embeddings is None:
+            embeddings = self.embed_chunks(chunks.iter_texts())
+        self.chunk_embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.embedder.fit(self.chunk_embeddings)
+        self.index = VectorIndex(self.chunk_embeddings)
         print(f"    Indexed {len(chunks)} document chunks")
     
-    def retrieve_relevant_chunks(self, query: str, top_k: int = 3) -> List[str]:
-        """Retrieve most relevant chunks (simplified - returns first chunks)"""
-        # Simple retrieval: return first chunks as context
-        # In production, you'd use embeddings and similarity search
-        return self.chunks[:top_k]
+    def retrieve_relevant_chunks(self, query: str, top_k: int = 3) -> List[Chunk]:
+        """Retrieve the top_k chunks by cosine similarity to the query"""
+        if not len(self.chunks):
+            return []
+        query_embedding = self.embedder.embed_query(query)
+        return [self.chunks[i] for i in self.index.search(query_embedding, top_k)]
 
 class GeminiTestGenerator:  
     """Test generator with RAG support"""
@@ -88,22 +407,45 @@ class GeminiTestGenerator:
         
         genai.configure(api_key=api_key)
         
+        self.generation_config = {
+            "temperature": 0.1,
+            "max_output_tokens": 8192,
+        }
         self.model = genai.GenerativeModel(
             model_name=model,
-            generation_config={
-                "temperature": 0.1,
-                "max_output_tokens": 8192,
-            }
+            generation_config=self.generation_config
         )
         
         self.model_name = model
+        self.llm = LLMClient(
+            self.model,
+            requests_per_minute=self.config.REQUESTS_PER_MINUTE,
+            max_in_flight=self.config.MAX_CONCURRENT_REQUESTS,
+            timeout=self.config.REQUEST_TIMEOUT,
+            max_retries=self.config.MAX_RETRIES,
+            limit_key=model
+        )
+        self.response_cache = build_response_cache(
+            self.config.RESPONSE_CACHE,
+            self.config.RESPONSE_CACHE_PATH,
+            ttl=self.config.RESPONSE_CACHE_TTL,
+            max_entries=self.config.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=self.config.RESPONSE_CACHE_MAX_BYTES
+        )
         
         # Initialize RAG components
         self.pdf_processor = PDFProcessor(
             chunk_size=self.config.CHUNK_SIZE,
-            chunk_overlap=self.config.CHUNK_OVERLAP
+            chunk_overlap=self.config.CHUNK_OVERLAP,
+            strategy=self.config.CHUNK_STRATEGY,
+            chunk_tokens=self.config.CHUNK_TOKENS,
+            overlap_tokens=self.config.CHUNK_OVERLAP_TOKENS
         )
         self.rag_retriever = RAGRetriever(self.model)
+        self.web_data_encoder = WebDataEncoder(self.config.WEB_DATA_FORMAT, self.config.DROP_NAVIGATION_LINKS)
+        if self.config.LOG_PROMPT_SIZES:
+            self.web_data_encoder.add_hook(print_prompt_size)
+        self.index_cache = IndexCache(self.config.INDEX_CACHE_DIR) if self.config.INDEX_CACHE_DIR else None
         self.knowledge_base = ""
         
         # Load PDFs if provided
@@ -112,10 +454,48 @@ class GeminiTestGenerator:
     
     
     
+    def _load_document(self, pdf_path: str) -> CachedDocument:
+        """Parse, chunk and embed one PDF, reusing the on-disk cache when possible"""
+        embedder_signature = self.rag_retriever.embedder.signature
+        key = None
+        if self.index_cache:
+            key = self.index_cache.key(file_digest(pdf_path), self.pdf_processor.signature)
+            document = self.index_cache.load(key, embedder_signature)
+            if document is not None:
+                if document.embeddings is None:
+                    document.embeddings = self.rag_retriever.embed_chunks(document.iter_chunk_texts())
+                    self.index_cache.store_embeddings(key, document.embeddings, embedder_signature)
+                print(f"    ✓ Loaded {len(document.text)} characters (cached)")
+                return document
+        
+        # Pages stream into the chunker and chunks into the embedder, so no
+        # chunk text outlives its embedding batch
+        pages = []
+        offsets = []
+        
+        def page_stream():
+            for page in self.pdf_processor.iter_pages(pdf_path):
+                pages.append(page)
+                yield page
+        
+        def chunk_stream():
+            for start, end, chunk in self.pdf_processor.iter_chunks(page_stream()):
+                offsets.append((start, end))
+                yield chunk
+        
+        embeddings = self.rag_retriever.embed_chunks(chunk_stream())
+        text = "".join(pages)
+        document = CachedDocument(text, np.array(offsets, dtype=np.int64).reshape(-1, 2), embeddings)
+        if key:
+            self.index_cache.store(key, document, embedder_signature, meta={"source": Path(pdf_path).name})
+        print(f"    ✓ Loaded {len(text)} characters")
+        return document
+    
     def load_pdf_documents(self, pdf_paths: List[str]):
         """Load and index PDF documents"""
         print("\n Loading PDF documents...")
-        all_text = ""
+        chunks = ChunkStore()
+        embeddings = []
         
         for pdf_path in pdf_paths:
             if not os.path.exists(pdf_path):
@@ -124,17 +504,21 @@ class GeminiTestGenerator:
             
             print(f"    Loading: {Path(pdf_path).name}")
             try:
-                text = self.pdf_processor.load_pdf(pdf_path)
-                all_text += text + "\n\n"
-                print(f"    ✓ Loaded {len(text)} characters")
+                document = self._load_document(pdf_path)
             except Exception as e:
                 print(f"    ✗ Error loading {pdf_path}: {str(e)}")
+                continue
+            if not document.text:
+                continue
+            # The document text becomes the chunks' backing buffer; nothing is sliced here
+            chunks.add_document(document.text, document.offsets)
+            embeddings.append(document.embeddings)
         
-        if all_text:
-            # Chunk the combined text
-            chunks = self.pdf_processor.chunk_text(all_text)
-            self.rag_retriever.index_documents(chunks)
-            self.knowledge_base = all_text[:20000]  # Store first 20k chars for quick access
+        if chunks.buffers:
+            # Chunks are per document so each PDF's index can be cached on its own
+            matrix = embeddings[0] if len(embeddings) == 1 else np.vstack(embeddings)
+            self.rag_retriever.index_documents(chunks, matrix)
+            self.knowledge_base = "\n\n".join(text[:20000] for text in chunks.buffers)[:20000]  # Store first 20k chars for quick access
             print(f"    ✓ RAG knowledge base ready with {len(chunks)} chunks\n")
         else:
             print("      No PDF content loaded\n")
@@ -143,26 +527,129 @@ class GeminiTestGenerator:
         """Add a single PDF document to the knowledge base"""
         self.load_pdf_documents([pdf_path])
     
-    def generate_test_cases(self, web_data: Dict, user_stories: List[str] = None) -> Dict:
-        """Generate main test cases with RAG context"""
+    def _generate_parsed(self, prompt: str, parse, is_valid, key: str = None) -> Tuple[Any, bool]:
+        """Call the model through the response cache and parse the text
+        
+        parse returns (parsed, complete). Only complete responses that parse
+        into something usable are cached, so a malformed or cut-off reply is
+        retried on the next run. The cache key defaults to a hash of the
+        prompt. Returns (parsed, cache_hit).
+        """
+        cache = self.response_cache
+        if cache is None:
+            key = None
+        elif key is None:
+            key = cache_key(self.model_name, self.generation_config, prompt)
+        if key is not None:
+            text = cache.get(key)
+            if text is not None:
+                parsed, complete = parse(text)
+                if complete and is_valid(parsed):
+                    return parsed, True
+                cache.delete(key)
+        
+        text = self.llm.generate_text(prompt)
+        parsed, complete = parse(text)
+        if key is not None and complete and is_valid(parsed):
+            cache.put(key, text)
+        return parsed, False
+    
+    def _generate_streamed(self, prompt: str, on_item) -> Tuple[List[Dict], bool, bool]:
+        """Stream the main response, passing each test case to on_item as it completes
+        
+        A response that is cut off (max_output_tokens, or a stream error after
+        some cases arrived) keeps every complete case but isn't cached.
+        Returns (test_cases, cache_hit, truncated).
+        """
+        cache = self.response_cache
+        key = cache_key(self.model_name, self.generation_config, prompt) if cache is not None else None
+        if key is not None:
+            text = cache.get(key)
+            if text is not None:
+                items = parse_json_items(text, "test_cases")
+                if items:
+                    for item in items:
+                        on_item(item)
+                    return items, True, False
+                cache.delete(key)
+        
+        parser = JSONItemParser("test_cases")
+        parts = []
+        items = []
+        failed = False
+        try:
+            for chunk in self.llm.stream_text(prompt):
+                parts.append(chunk)
+                for item in parser.feed(chunk):
+                    items.append(item)
+                    on_item(item)
+        except Exception as e:
+            if not items:
+                raise
+            print(f"    Response stream failed after {len(items)} test cases: {str(e)}")
+            failed = True
+        
+        truncated = failed or not parser.done
+        if key is not None and items and not truncated:
+            cache.put(key, "".join(parts))
+        return items, False, truncated
+    
+    def _retrieval_query(self, web_data: Dict, focus: str, user_stories: List[str] = None) -> str:
+        """Build a retrieval query from the crawl's form fields and buttons"""
+        terms = [f"test cases for {web_data.get('basic_info', {}).get('url', 'web application')}", focus]
+        for page in web_data.get('pages', {}).values():
+            terms.extend(inp.get('name', '') or inp.get('placeholder', '') for inp in page.get('inputs', []))
+            terms.extend(btn.get('text', '') for btn in page.get('buttons', []))
+        terms.extend(user_stories or [])
+        return " ".join(t for t in terms if t)
+    
+    def generate_test_cases(self, web_data: Dict, user_stories: List[str] = None, on_test_case=None,
+                            per_page: bool = None) -> Dict:
+        """Generate main test cases with RAG context
+        
+        With STREAM_RESPONSES, on_test_case(case) is called for each test
+        case as soon as it has been received, so callers can show progress.
+        per_page overrides Config.PER_PAGE_GENERATION for this call.
+        """
+        if per_page is None:
+            per_page = self.config.PER_PAGE_GENERATION
+        if per_page:
+            return self.generate_page_test_cases(web_data, user_stories, on_test_case=on_test_case)
+        
         # Retrieve relevant context from PDFs
         context = ""
         if self.knowledge_base:
-            query = f"test cases for {web_data.get('basic_info', {}).get('url', 'web application')}"
-            relevant_chunks = self.rag_retriever.retrieve_relevant_chunks(query, top_k=2)
-            context = "\n\n".join(relevant_chunks)
+            query = self._retrieval_query(
+                web_data,
+                "test cases positive negative boundary value state transition security",
+                user_stories
+            )
+            relevant_chunks = self.rag_retriever.retrieve_relevant_chunks(query, top_k=self.config.CONTEXT_CANDIDATES)
+            context = pack_context(relevant_chunks, self.config.MAIN_CONTEXT_TOKENS)
         
         prompt = self._build_main_prompt(web_data, user_stories, context)
         
         try:
-            response = self.model.generate_content(prompt)
-            test_cases = self._parse_response(response.text)
+            truncated = False
+            if self.config.STREAM_RESPONSES:
+                cases, cache_hit, truncated = self._generate_streamed(prompt, on_test_case or (lambda case: None))
+                test_cases = {'test_cases': cases}
+            else:
+                test_cases, cache_hit = self._generate_parsed(
+                    prompt,
+                    self._parse_response,
+                    lambda parsed: bool(parsed.get('test_cases'))
+                )
+                for case in test_cases['test_cases'] if on_test_case else []:
+                    on_test_case(case)
             
             test_cases['metadata'] = {
                 'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
                 'model_used': self.model_name,
                 'ai_generated': True,
-                'rag_enabled': bool(self.knowledge_base)
+                'rag_enabled': bool(self.knowledge_base),
+                'cache_hit': cache_hit,
+                'truncated': truncated
             }
             
             return test_cases
@@ -171,75 +658,240 @@ class GeminiTestGenerator:
             print(f"    Error generating test cases: {str(e)}")
             return self._get_fallback_tests(web_data)
     
-    def generate_test_suites(self, web_data: Dict) -> Dict:
-        """Generate 4 specialized test suites with RAG context"""
-        print("    Generating test suites with AI...")
-        
-        suites = {}
+    def _page_case_id(self, page_url: str, n: int) -> str:
+        """Stable ID: derived from the page URL, so other pages never renumber it"""
+        return f"TC-{hashlib.sha1(page_url.encode('utf-8')).hexdigest()[:6].upper()}-{n:02d}"
+    
+    def _generate_page(self, web_data: Dict, page_url: str, page: Dict, user_stories: List[str] = None) -> Tuple[List[Dict], bool]:
+        """Test cases for one page, cached by the page's fingerprint
         
-        # Get relevant context once for all suites
+        The cache key covers the page URL, the fingerprint of its raw
+        (pre-dedup) elements and the prompt rendered around it (template,
+        encoding, site info, user stories, context and case count), so a page
+        is re-prompted only when one of those changes, whatever order the
+        crawl recorded it in. Returns (tests, cache_hit).
+        """
+        page_data = {"basic_info": web_data.get("basic_info", {}), "pages": {page_url: page}}
         context = ""
         if self.knowledge_base:
-            query = f"test suites for {web_data.get('basic_info', {}).get('url', 'web application')}"
-            relevant_chunks = self.rag_retriever.retrieve_relevant_chunks(query, top_k=2)
-            context = "\n\n".join(relevant_chunks)
-        
-        # Suite 1: Performance Tests
-        print("    Generating Performance Test Suite...")
-        suites['performance'] = self._generate_suite(
-            web_data, 
-            "performance",
-            "Generate 4 performance test cases focusing on: page load time, API response time, resource optimization, caching, database performance",
-            context
-        )
+            query = self._retrieval_query(
+                page_data,
+                "test cases positive negative boundary value state transition security",
+                user_stories
+            )
+            relevant_chunks = self.rag_retriever.retrieve_relevant_chunks(query, top_k=self.config.CONTEXT_CANDIDATES)
+            context = pack_context(relevant_chunks, self.config.PAGE_CONTEXT_TOKENS)
         
-        # Suite 2: Cross-Browser Tests
-        print("    Generating Cross-Browser Test Suite...")
-        suites['cross_browser'] = self._generate_suite(
-            web_data,
-            "cross_browser",
-            "Generate 4 cross-browser compatibility test cases for Chrome, Firefox, Edge. Focus on: rendering consistency, JavaScript compatibility, CSS support",
-            context
+        # Key the prompt without its page block, which depends on crawl order after dedup;
+        # the page itself is keyed by its raw fingerprint
+        frame = self._build_page_prompt(page_data, user_stories, context, page_block="")
+        key = cache_key(self.model_name, self.generation_config, json.dumps({
+            "page": page_url,
+            "fingerprint": page.get("fingerprint") or page_fingerprint(page),
+            "site": page_data["basic_info"],
+            "encoding": [self.web_data_encoder.fmt, self.web_data_encoder.drop_navigation],
+            "prompt": hashlib.sha256(frame.encode("utf-8")).hexdigest()
+        }, sort_keys=True))
+        prompt = self._build_page_prompt(page_data, user_stories, context)
+        parsed, cache_hit = self._generate_parsed(
+            prompt,
+            self._parse_response,
+            lambda parsed: bool(parsed.get('test_cases')),
+            key=key
         )
         
-        # Suite 3: Responsive Design Tests
-        print("    Generating Responsive Design Test Suite...")
-        suites['responsive_design'] = self._generate_suite(
-            web_data,
-            "responsive_design",
-            "Generate 4 responsive design test cases for resolutions: 1920x1080, 1366x768, 768x1024, 375x667, 320x568. Focus on: layout adaptation, touch targets, font scaling",
-            context
-        )
+        tests = []
+        for n, test in enumerate(parsed.get('test_cases', []), 1):
+            test['id'] = self._page_case_id(page_url, n)
+            test['page'] = page_url
+            tests.append(test)
+        return tests, cache_hit
+    
+    def generate_page_test_cases(self, web_data: Dict, user_stories: List[str] = None, concurrent: bool = None,
+                                 on_test_case=None) -> Dict:
+        """Generate main test cases page by page and merge them
         
-        # Suite 4: Stress Tests
-        print("    ⚡ Generating Stress Test Suite...")
-        suites['stress'] = self._generate_suite(
-            web_data,
-            "stress",
-            "Generate 4 stress test cases focusing on: high concurrent users, memory usage, network latency, long duration testing, database load",
-            context
-        )
+        Each page of web_data["pages"] gets its own small prompt, cached by
+        page fingerprint, so after an incremental crawl only changed pages are
+        re-prompted. Pages with nothing to test are skipped. Merged cases keep
+        page order and carry stable per-page IDs. on_test_case(case) is called
+        in the calling thread for each case as its page's result arrives.
+        """
+        if concurrent is None:
+            concurrent = self.config.CONCURRENT_GENERATION
+        
+        pages = [
+            (page_url, page) for page_url, page in web_data.get('pages', {}).items()
+            if page.get('inputs') or page.get('buttons') or page.get('links')
+        ]
+        
+        def generate(page_url, page):
+            try:
+                return self._generate_page(web_data, page_url, page, user_stories)
+            except Exception as e:
+                print(f"    Error generating test cases for {page_url}: {str(e)}")
+                return [], False
+        
+        def report(tests):
+            for test in tests if on_test_case else []:
+                on_test_case(test)
+        
+        if concurrent and len(pages) > 1:
+            results = [None] * len(pages)
+            with ThreadPoolExecutor(max_workers=self._max_workers(len(pages))) as executor:
+                futures = {executor.submit(generate, page_url, page): i for i, (page_url, page) in enumerate(pages)}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    report(future.result()[0])
+        else:
+            results = []
+            for page_url, page in pages:
+                results.append(generate(page_url, page))
+                report(results[-1][0])
+        
+        test_cases = [test for tests, _ in results for test in tests]
+        if not test_cases:
+            return self._get_fallback_tests(web_data)
+        
+        pages_cached = sum(1 for tests, cache_hit in results if cache_hit)
+        print(f"    Per-page generation: {len(pages)} pages, {len(pages) - pages_cached} prompted, {pages_cached} from cache")
+        return {
+            'test_cases': test_cases,
+            'metadata': {
+                'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'model_used': self.model_name,
+                'ai_generated': True,
+                'rag_enabled': bool(self.knowledge_base),
+                'cache_hit': pages_cached == len(pages),
+                'generation_mode': 'per_page',
+                'pages_generated': len(pages) - pages_cached,
+                'pages_cached': pages_cached
+            }
+        }
+    
+    # Suite key -> (progress label, instructions); order defines output key order
+    SUITE_SPECS = {
+        "performance": (
+            "Performance",
+            "Generate 4 performance test cases focusing on: page load time, API response time, resource optimization, caching, database performance"
+        ),
+        "cross_browser": (
+            "Cross-Browser",
+            "Generate 4 cross-browser compatibility test cases for Chrome, Firefox, Edge. Focus on: rendering consistency, JavaScript compatibility, CSS support"
+        ),
+        "responsive_design": (
+            "Responsive Design",
+            "Generate 4 responsive design test cases for resolutions: 1920x1080, 1366x768, 768x1024, 375x667, 320x568. Focus on: layout adaptation, touch targets, font scaling"
+        ),
+        "stress": (
+            "Stress",
+            "Generate 4 stress test cases focusing on: high concurrent users, memory usage, network latency, long duration testing, database load"
+        ),
+    }
+    
+    def _suite_context(self, web_data: Dict) -> str:
+        """Retrieve RAG context shared by all suites"""
+        context = ""
+        if self.knowledge_base:
+            query = self._retrieval_query(
+                web_data,
+                "test suites performance load cross browser compatibility responsive design stress testing"
+            )
+            relevant_chunks = self.rag_retriever.retrieve_relevant_chunks(query, top_k=self.config.CONTEXT_CANDIDATES)
+            context = pack_context(relevant_chunks, self.config.SUITE_CONTEXT_TOKENS)
+        return context
+    
+    def _safe_generate_suite(self, web_data: Dict, suite_type: str, context: str) -> List[Dict]:
+        """Generate one suite, falling back to defaults on any failure (the only suite fallback)"""
+        label, instructions = self.SUITE_SPECS[suite_type]
+        print(f"    Generating {label} Test Suite...")
+        try:
+            return self._generate_suite(web_data, suite_type, instructions, context)
+        except Exception:
+            print(f"    AI failed for {suite_type}, using default tests")
+            return self._get_default_suite_tests(web_data, suite_type)
+    
+    def _submit_suites(self, executor: ThreadPoolExecutor, web_data: Dict) -> Dict:
+        """Submit every suite to the executor, keyed in SUITE_SPECS order"""
+        context = self._suite_context(web_data)
+        return {
+            suite_type: executor.submit(self._safe_generate_suite, web_data, suite_type, context)
+            for suite_type in self.SUITE_SPECS
+        }
+    
+    def _collect_suites(self, futures: Dict) -> Dict:
+        """Wait for suite futures; _safe_generate_suite already fell back for failed suites"""
+        return {suite_type: future.result() for suite_type, future in futures.items()}
+    
+    def _max_workers(self, jobs: int) -> int:
+        return max(1, min(jobs, self.config.MAX_CONCURRENT_REQUESTS))
+    
+    def generate_test_suites(self, web_data: Dict, concurrent: bool = None) -> Dict:
+        """Generate 4 specialized test suites with RAG context"""
+        print("    Generating test suites with AI...")
+        
+        if concurrent is None:
+            concurrent = self.config.CONCURRENT_GENERATION
+        
+        if not concurrent:
+            context = self._suite_context(web_data)
+            return {
+                suite_type: self._safe_generate_suite(web_data, suite_type, context)
+                for suite_type in self.SUITE_SPECS
+            }
         
-        return suites
+        with ThreadPoolExecutor(max_workers=self._max_workers(len(self.SUITE_SPECS))) as executor:
+            futures = self._submit_suites(executor, web_data)
+            return self._collect_suites(futures)
     
-    def generate_all_tests(self, web_data: Dict, user_stories: List[str] = None):
+    def generate_all_tests(self, web_data: Dict, user_stories: List[str] = None, concurrent: bool = None,
+                           on_test_case=None, per_page: bool = None):
         """
         Generate both main test cases and all test suites
         Returns everything in one call - perfect for UI integration
+        
+        With concurrent=True (the Config default) the main prompt and the four
+        suite prompts are sent at once, so wall-clock time is roughly the
+        slowest call instead of the sum of all five. With on_test_case the
+        main cases are generated in the calling thread (suites still run in
+        the background), so the callback can update a UI as cases arrive.
+        per_page overrides Config.PER_PAGE_GENERATION without changing the
+        (possibly shared) generator's config.
         """
         print("\n" + "="*60)
         print(" GENERATING ALL TESTS WITH AI")
         print("="*60)
         
-        # Generate main test cases
-        print("\n Generating Main Test Cases...")
-        main_test_cases = self.generate_test_cases(web_data, user_stories)
-        print(f"    Generated {len(main_test_cases.get('test_cases', []))} main test cases")
+        if concurrent is None:
+            concurrent = self.config.CONCURRENT_GENERATION
         
-        # Generate test suites
-        print("\n📦 Generating Test Suites...")
-        test_suites = self.generate_test_suites(web_data)
-        print("    All test suites generated")
+        if not concurrent:
+            # Generate main test cases
+            print("\n Generating Main Test Cases...")
+            main_test_cases = self.generate_test_cases(web_data, user_stories, on_test_case, per_page)
+            print(f"    Generated {len(main_test_cases.get('test_cases', []))} main test cases")
+            
+            # Generate test suites
+            print("\n📦 Generating Test Suites...")
+            test_suites = self.generate_test_suites(web_data, concurrent=False)
+            print("    All test suites generated")
+        else:
+            print("\n Generating Main Test Cases and Test Suites concurrently...")
+            with ThreadPoolExecutor(max_workers=self._max_workers(1 + len(self.SUITE_SPECS))) as executor:
+                main_future = None if on_test_case else executor.submit(self.generate_test_cases, web_data, user_stories, None, per_page)
+                suite_futures = self._submit_suites(executor, web_data)
+                
+                try:
+                    if main_future is not None:
+                        main_test_cases = main_future.result()
+                    else:
+                        main_test_cases = self.generate_test_cases(web_data, user_stories, on_test_case, per_page)
+                except Exception as e:
+                    print(f"    Error generating test cases: {str(e)}")
+                    main_test_cases = self._get_fallback_tests(web_data)
+                test_suites = self._collect_suites(suite_futures)
+            print(f"    Generated {len(main_test_cases.get('test_cases', []))} main test cases")
+            print("    All test suites generated")
         
         return {
             "main_test_cases": main_test_cases,
@@ -248,20 +900,20 @@ class GeminiTestGenerator:
         }
     
     def _generate_suite(self, web_data: Dict, suite_type: str, instructions: str, context: str = "") -> List[Dict]:
-        """Generate a specific test suite with RAG context"""
+        """Generate a specific test suite with RAG context; errors propagate to _safe_generate_suite"""
         
         context_section = ""
         if context:
             context_section = f"""
 REFERENCE DOCUMENTATION:
-{context[:3000]}
+{context}
 
 Use the above documentation to inform your test cases.
 """
         
         prompt = f"""Generate 4 {suite_type.replace('_', ' ')} test cases for this website:
         
-{json.dumps(web_data, indent=2)}
+{self.web_data_encoder.encode(web_data, suite_type)}
 
 {context_section}
 
@@ -279,30 +931,20 @@ Output format - MUST BE VALID JSON ARRAY:
   }}
 ]"""
         
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_suite_response(response.text, suite_type)
-        except Exception as e:
-            print(f"    AI failed for {suite_type}, using default tests")
-            return self._get_default_suite_tests(web_data, suite_type)
+        tests, _ = self._generate_parsed(
+            prompt,
+            lambda text: self._parse_suite_response(text, suite_type),
+            bool
+        )
+        return tests
     
-    def _parse_suite_response(self, response_text: str, suite_type: str) -> List[Dict]:
-        """Parse suite response"""
-        try:
-            text = response_text.strip()
-            text = re.sub(r'```json\s*', '', text)
-            text = re.sub(r'```\s*', '', text)
-            
-            json_match = re.search(r'(\[.*\])', text, re.DOTALL)
-            if json_match:
-                tests = json.loads(json_match.group(1))
-                for test in tests:
-                    test.setdefault('id', f"{suite_type.upper()[:4]}-{len(tests)}")
-                    test.setdefault('suite_type', suite_type)
-                return tests
-            return []
-        except:
-            return []
+    def _parse_suite_response(self, response_text: str, suite_type: str) -> Tuple[List[Dict], bool]:
+        """Parse suite response; a truncated array keeps its complete tests. Returns (tests, complete)"""
+        tests, complete = parse_json_array(response_text)
+        for test in tests:
+            test.setdefault('id', f"{suite_type.upper()[:4]}-{len(tests)}")
+            test.setdefault('suite_type', suite_type)
+        return tests, complete
     
     def _get_default_suite_tests(self, web_data: Dict, suite_type: str) -> List[Dict]:
         """Default test suites if AI fails"""
@@ -382,7 +1024,7 @@ Output format - MUST BE VALID JSON ARRAY:
         if context:
             context_section = f"""
 REFERENCE DOCUMENTATION FROM PDF:
-{context[:5000]}
+{context}
 
 Use the above documentation as reference when creating test cases.
 """
@@ -396,7 +1038,7 @@ USER STORIES:
         
         return f"""Generate 20 test cases for this web application:
 
-{json.dumps(web_data, indent=2)}
+{self.web_data_encoder.encode(web_data, "main")}
 
 {context_section}
 
@@ -426,19 +1068,65 @@ Output format - MUST BE VALID JSON:
   ]
 }}"""
     
-    def _parse_response(self, response_text: str) -> Dict:
-        """Parse AI response for main test cases"""
-        try:
-            text = response_text.strip()
-            text = re.sub(r'```json\s*', '', text)
-            text = re.sub(r'```\s*', '', text)
-            
-            json_match = re.search(r'(\{.*\})', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            return json.loads(text)
-        except:
-            return {"test_cases": []}
+    def _build_page_prompt(self, page_data: Dict, user_stories: List[str], context: str = "", page_block: str = None) -> str:
+        """Build prompt for the main test cases of a single page (page_block replaces the encoded page)"""
+        
+        if page_block is None:
+            page_block = self.web_data_encoder.encode(page_data, "page")
+        
+        context_section = ""
+        if context:
+            context_section = f"""
+REFERENCE DOCUMENTATION FROM PDF:
+{context}
+
+Use the above documentation as reference when creating test cases.
+"""
+        
+        user_stories_section = ""
+        if user_stories:
+            user_stories_section = f"""
+USER STORIES:
+{json.dumps(user_stories, indent=2)}
+"""
+        
+        cases = self.config.CASES_PER_PAGE
+        return f"""Generate {cases} test cases for this page of a web application:
+
+{page_block}
+
+{context_section}
+
+{user_stories_section}
+
+Requirements:
+- {(cases + 1) // 2} positive test cases (valid scenarios)
+- {cases // 2} negative test cases (error scenarios)
+- Only test the inputs, buttons and links of this page
+- Include where they apply: boundary testing, state transition, security testing
+
+Output format - MUST BE VALID JSON:
+{{
+  "test_cases": [
+    {{
+      "id": "TC001",
+      "name": "Test name",
+      "type": "positive",
+      "priority": "high",
+      "test_technique": "boundary",
+      "steps": ["1. Step one", "2. Step two"],
+      "expected_result": "Expected outcome"
+    }}
+  ]
+}}"""
+    
+    def _parse_response(self, response_text: str) -> Tuple[Dict, bool]:
+        """Parse AI response for main test cases; a truncated response keeps its complete cases
+        
+        Returns (test cases, complete).
+        """
+        test_cases, complete = parse_json_array(response_text, "test_cases")
+        return {"test_cases": test_cases}, complete
     
     def _get_fallback_tests(self, web_data: Dict) -> Dict:
         """Fallback tests"""
@@ -458,6 +1146,31 @@ Output format - MUST BE VALID JSON:
         }
 
 
+def config_signature() -> str:
+    """Hash of every Config setting (the API key only by digest)"""
+    settings = {k: v for k, v in vars(Config).items() if k.isupper()}
+    settings["GEMINI_API_KEY"] = hashlib.sha256((settings["GEMINI_API_KEY"] or "").encode("utf-8")).hexdigest()
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+_generators: Dict[Tuple, "GeminiTestGenerator"] = {}
+_generators_lock = threading.Lock()
+
+
+def get_generator(pdf_paths: List[str] = None) -> GeminiTestGenerator:
+    """Process-wide generator per (Config, PDF contents)
+    
+    PDFs are parsed and indexed once; later calls with the same settings and
+    the same file contents (under any path) reuse the loaded knowledge base.
+    """
+    paths = pdf_paths or ["blackbox-07.pdf"]
+    key = (config_signature(),) + tuple(file_digest(p) if os.path.exists(p) else p for p in paths)
+    with _generators_lock:
+        if key not in _generators:
+            _generators[key] = GeminiTestGenerator(pdf_paths=paths)
+        return _generators[key]
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize with PDF documents
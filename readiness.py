@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+
+# Counts fetch/XHR requests still in flight. Installed on every new document
+# where the driver supports it (install_request_tracker), otherwise on the
+# first snapshot, which misses requests started before it.
+TRACKER_SCRIPT = """
+if (!window.__testinyPending) {
+    const pending = window.__testinyPending = {count: 0};
+    const done = () => { pending.count = Math.max(0, pending.count - 1); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            pending.count++;
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        pending.count++;
+        this.addEventListener("loadend", done, {once: true});
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+# One round trip per poll: installs a MutationObserver on first call and
+# reports readyState, completed resource count, requests in flight and ms
+# since the last mutation.
+SNAPSHOT_SCRIPT = TRACKER_SCRIPT + """
+if (!window.__testinyReady) {
+    window.__testinyReady = {last: performance.now()};
+    new MutationObserver(() => { window.__testinyReady.last = performance.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return {
+    state: document.readyState,
+    resources: performance.getEntriesByType("resource").length,
+    pending: window.__testinyPending.count,
+    quiet_ms: performance.now() - window.__testinyReady.last
+};
+"""
+
+
+def install_request_tracker(driver):
+    """Count fetch/XHR requests from the start of every document (Chromium drivers only)"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": TRACKER_SCRIPT})
+        return True
+    except Exception:
+        return False
+
+
+class ReadyState:
+    """document.readyState has reached complete"""
+
+    name = "ready_state"
+
+    def start(self):
+        pass
+
+    def is_ready(self, snapshot, now):
+        return snapshot["state"] == "complete"
+
+
+class NetworkIdle:
+    """No fetch/XHR in flight and no new resource timing entries for idle_ms after the DOM is parsed"""
+
+    name = "network_idle"
+
+    def __init__(self, idle_ms=500):
+        self.idle_ms = idle_ms
+
+    def start(self):
+        self.count = None
+        self.since = None
+
+    def is_ready(self, snapshot, now):
+        if snapshot["state"] == "loading":
+            return False
+        if snapshot["resources"] != self.count or snapshot.get("pending"):
+            self.count = snapshot["resources"]
+            self.since = now
+            return False
+        return (now - self.since) * 1000 >= self.idle_ms
+
+
+class DomQuiescence:
+    """No DOM mutations for quiet_ms after the DOM is parsed"""
+
+    name = "dom_quiescence"
+
+    def __init__(self, quiet_ms=300):
+        self.quiet_ms = quiet_ms
+
+    def start(self):
+        pass
+
+    def is_ready(self, snapshot, now):
+        return snapshot["state"] != "loading" and snapshot["quiet_ms"] >= self.quiet_ms
+
+
+class AdaptiveTimeouts:
+    """Per-domain wait timeout learned from earlier pages
+
+    The timeout is twice the 90th percentile of recent waits on the domain,
+    clamped to [min_timeout, max_timeout]. Shared by all crawl workers.
+    """
+
+    def __init__(self, min_timeout=1.0, max_timeout=10.0, history=20):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.waits = defaultdict(lambda: deque(maxlen=history))
+        self.lock = threading.Lock()
+
+    def timeout_for(self, url):
+        with self.lock:
+            waits = sorted(self.waits[urlparse(url).netloc])
+        if len(waits) < 3:
+            return self.max_timeout
+        p90 = waits[min(len(waits) - 1, int(len(waits) * 0.9))]
+        return min(self.max_timeout, max(self.min_timeout, p90 * 2))
+
+    def observe(self, url, waited):
+        with self.lock:
+            self.waits[urlparse(url).netloc].append(waited)
+
+
+DOMAIN_TIMEOUTS = AdaptiveTimeouts()
+
+
+class ReadinessWaiter:
+    """Poll readiness conditions after navigation until the first one is satisfied,
+    or with require_all until all of them are at once
+
+    wait() returns {"strategy": <condition(s) that fired, or "timeout">,
+    "waited_ms": ..., "timeout_ms": ...} for the page record. With
+    adaptive=True the timeout comes from DOMAIN_TIMEOUTS.
+    """
+
+    def __init__(self, conditions, timeout=10.0, poll_interval=0.05, adaptive=False, require_all=False):
+        self.conditions = conditions
+        self.require_all = require_all
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.adaptive = adaptive
+
+    def wait(self, driver, url):
+        timeout = DOMAIN_TIMEOUTS.timeout_for(url) if self.adaptive else self.timeout
+        for condition in self.conditions:
+            condition.start()
+
+        started = time.monotonic()
+        fired = "timeout"
+        while True:
+            now = time.monotonic()
+            try:
+                snapshot = driver.execute_script(SNAPSHOT_SCRIPT)
+            except Exception:
+                snapshot = None  # Mid-navigation; try again
+            if snapshot:
+                # Every condition sees every snapshot, so their idle timers stay current
+                ready = [c.name for c in self.conditions if c.is_ready(snapshot, now)]
+                if ready and (not self.require_all or len(ready) == len(self.conditions)):
+                    fired = "+".join(ready) if self.require_all else ready[0]
+                    break
+            if now - started >= timeout:
+                break
+            time.sleep(self.poll_interval)
+
+        waited = time.monotonic() - started
+        if self.adaptive and fired != "timeout":
+            DOMAIN_TIMEOUTS.observe(url, waited)
+        return {
+            "strategy": fired,
+            "waited_ms": round(waited * 1000),
+            "timeout_ms": round(timeout * 1000)
+        }
+
+
+class FixedDelay:
+    """The original behaviour: always sleep a fixed time"""
+
+    def __init__(self, seconds=1.0):
+        self.seconds = seconds
+
+    def wait(self, driver, url):
+        time.sleep(self.seconds)
+        return {"strategy": "fixed", "waited_ms": round(self.seconds * 1000)}
+
+
+def create_waiter(strategy="auto", adaptive=True, timeout=10.0):
+    """Build a waiter by name
+
+    "auto" waits until ready_state, network_idle and dom_quiescence all
+    hold at once, so a page still fetching data after its DOM went quiet
+    isn't extracted early; "ready_state", "network_idle" and
+    "dom_quiescence" use one condition; "fixed" sleeps one second.
+    """
+    if strategy == "fixed":
+        return FixedDelay()
+    conditions = {
+        "auto": lambda: [ReadyState(), NetworkIdle(), DomQuiescence()],
+        "ready_state": lambda: [ReadyState()],
+        "network_idle": lambda: [NetworkIdle()],
+        "dom_quiescence": lambda: [DomQuiescence()],
+    }
+    if strategy not in conditions:
+        raise ValueError(f"Unknown readiness strategy: {strategy}")
+    return ReadinessWaiter(conditions[strategy](), timeout=timeout, adaptive=adaptive, require_all=strategy == "auto")
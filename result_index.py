@@ -0,0 +1,95 @@
+import bisect
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Optional
+
+TOKEN = re.compile(r"[a-z0-9]+")
+SEARCH_FIELDS = ("id", "name", "steps", "test_technique", "priority")
+DIGIT = re.compile(r"\d")
+FACETS = ("suite", "type", "priority", "test_technique", "page")
+
+
+def results_digest(results: Dict) -> str:
+    """Content hash of a result set, used as the cache key for indexes and exports"""
+    return hashlib.sha256(json.dumps(results, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def flatten_results(results: Dict) -> List[Dict]:
+    """Main test cases then every suite's tests, each tagged with its suite"""
+    tests = [dict(tc, suite="main") for tc in results.get("main_test_cases", {}).get("test_cases", [])]
+    for suite_name, suite_tests in results.get("test_suites", {}).items():
+        tests.extend(dict(tc, suite=suite_name) for tc in suite_tests)
+    return tests
+
+
+def _tokens(value) -> Iterable[str]:
+    if isinstance(value, list):
+        return [token for item in value for token in _tokens(item)]
+    return TOKEN.findall(str(value or "").lower())
+
+
+class ResultIndex:
+    """Inverted index and facet postings over a flat list of test cases
+
+    Built once per result set; search() and facet_counts() only touch
+    postings sets, never the test dicts. Query words match by prefix and all
+    of them must match; a word with a digit also matches anywhere inside a
+    test id ("001" finds TC001). Facet filters are OR within a facet and AND
+    across facets.
+    """
+
+    def __init__(self, tests: List[Dict]):
+        self.tests = tests
+        self.postings: Dict[str, set] = {}
+        self.facets: Dict[str, Dict[str, set]] = {facet: {} for facet in FACETS}
+
+        for i, test in enumerate(tests):
+            for field in SEARCH_FIELDS:
+                for token in _tokens(test.get(field)):
+                    self.postings.setdefault(token, set()).add(i)
+            for facet in FACETS:
+                value = test.get(facet)
+                if value:
+                    self.facets[facet].setdefault(str(value), set()).add(i)
+        self.vocabulary = sorted(self.postings)
+        self.id_texts = [str(test.get("id", "")).lower() for test in tests]
+        self.all_ids = set(range(len(tests)))
+
+    def _prefix_ids(self, prefix: str) -> set:
+        ids = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self.postings[token]
+        if DIGIT.search(prefix):
+            # ID-like word: also scan ids for it as a substring
+            ids |= {i for i, id_text in enumerate(self.id_texts) if prefix in id_text}
+        return ids
+
+    def search(self, query: str = "", filters: Optional[Dict[str, List[str]]] = None) -> List[int]:
+        """Ids (positions in tests, in order) matching every query word and filter"""
+        ids = self.all_ids
+        for word in _tokens(query):
+            ids = ids & self._prefix_ids(word)
+            if not ids:
+                return []
+        for facet, values in (filters or {}).items():
+            if values:
+                ids = ids & set().union(*(self.facets[facet].get(value, set()) for value in values))
+        return sorted(ids)
+
+    def facet_values(self, facet: str) -> List[str]:
+        return sorted(self.facets[facet])
+
+    def facet_counts(self, facet: str, ids: Iterable[int]) -> Dict[str, int]:
+        """How many of ids have each value of facet (values none of them have are left out)"""
+        ids = set(ids)
+        counts = {value: len(members & ids) for value, members in sorted(self.facets[facet].items())}
+        return {value: count for value, count in counts.items() if count}
+
+    def page(self, ids: List[int], page: int, page_size: int) -> List[Dict]:
+        """Tests on a 1-based page of ids"""
+        start = (page - 1) * page_size
+        return [self.tests[i] for i in ids[start:start + page_size]]
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from extract import extract_website_data, serve_directory
+
+SITE = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+TEMPLATE_SITE = os.path.join(os.path.dirname(__file__), "fixtures", "templates")
+
+
+@pytest.fixture(scope="module")
+def site_url():
+    server, base_url = serve_directory(SITE)
+    yield base_url + "/index.html"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_crawl_stops_at_max_pages(site_url, workers):
+    web_data = extract_website_data(site_url, max_pages=5, workers=workers, backend="http")
+
+    assert len(web_data["pages"]) == 5
+    assert web_data["basic_info"]["pages_crawled"] == 5
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_crawl_records_each_page_once(site_url, workers):
+    web_data = extract_website_data(site_url, max_pages=8, workers=workers, backend="http")
+
+    pages = {os.path.basename(url.rstrip("/")) or "index.html" for url in web_data["pages"]}
+    assert pages == set(os.listdir(SITE))
+    # Inputs are deduplicated across pages, so each field shows up on exactly one page
+    fields = [(field["name"], field["type"]) for page in web_data["pages"].values() for field in page["inputs"]]
+    assert sorted(fields) == [
+        ("email", "email"), ("message", "text"), ("name", "text"), ("password", "password"),
+        ("q", "search"), ("q", "text"), ("quantity", "number")
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_template_cap_only_limits_generic_url_patterns(workers):
+    # Every page shares the header form and nav; careers.html is the 5th such page and the only link to apply.html
+    server, base_url = serve_directory(TEMPLATE_SITE)
+    try:
+        web_data = extract_website_data(base_url + "/index.html", max_pages=20, workers=workers, backend="http")
+    finally:
+        server.shutdown()
+
+    crawled = {url[len(base_url):] for url in web_data["pages"]}
+    assert "/apply.html" in crawled
+    assert {"/about.html", "/shipping.html", "/privacy.html", "/careers.html"} <= crawled
+    # /product/{id} pages chain to each other; after 3 of the same layout the rest are skipped
+    assert {"/product/1.html", "/product/2.html", "/product/3.html"} <= crawled
+    assert "/product/5.html" not in crawled
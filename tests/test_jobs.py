@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import jobs
+from jobs import JobLost, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def make_stale(store, job_id):
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET updated_at = 0 WHERE id = ?", (job_id,))
+
+
+def test_worker_that_lost_its_job_cannot_write_to_it(store):
+    job_id = store.submit({"url": "https://example.com"})
+    store.claim("w1")
+    make_stale(store, job_id)
+    assert store.requeue_stale() == 1
+    store.claim("w2")
+
+    with pytest.raises(JobLost):
+        store.update(job_id, "generate", 0.5, "late progress", worker="w1")
+    with pytest.raises(JobLost):
+        store.finish(job_id, {"from": "w1"}, worker="w1")
+    store.finish(job_id, {"from": "w2"}, worker="w2")
+
+    job = store.get(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"from": "w2"}
+
+
+def test_heartbeat_keeps_a_slow_job_from_being_requeued(store, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL", 0.05)
+
+    def slow_stages(store, job_id, params, url, worker, report, check):
+        make_stale(store, job_id)
+        time.sleep(0.3)  # A stage without progress reports, such as the suites
+        assert store.requeue_stale(stale_after=0.2) == 0
+        check()
+        store.finish(job_id, {"ok": True}, worker=worker)
+
+    monkeypatch.setattr(jobs, "_run_stages", slow_stages)
+    job_id = store.submit({"url": "https://example.com"})
+    jobs.run_job(store, store.claim("w1"))
+
+    assert store.get(job_id)["status"] == "done"
+
+
+def test_requeued_job_stops_at_the_next_stage(store, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL", 0.05)
+
+    def taken_over(store, job_id, params, url, worker, report, check):
+        make_stale(store, job_id)
+        store.requeue_stale(stale_after=0)
+        store.claim("w2")
+        time.sleep(0.2)
+        report("generate", 0.5, "ignored")
+        check()
+
+    monkeypatch.setattr(jobs, "_run_stages", taken_over)
+    job_id = store.submit({"url": "https://example.com"})
+    with pytest.raises(JobLost):
+        jobs.run_job(store, store.claim("w1"))
+
+    job = store.get(job_id, with_result=False)
+    assert job["worker"] == "w2"
+    assert job["status"] == "running"
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from json_stream import iter_json_items, parse_json_array, parse_json_items
+
+CASES = [
+    {"test_id": "TC001", "steps": ["Open [login] page", "Type ] and [ into name"], "expected_result": "Error {shown}"},
+    {"test_id": "TC002", "steps": [["nested", "list"], []], "data": {"a": "}{", "b": [1, [2, 3]]}},
+    {"test_id": "TC003", "steps": [], "expected_result": "Quote \" and \\ escaped"},
+]
+KEYED = json.dumps({"summary": {"counts": [1, 2]}, "test_cases": CASES}, indent=2)
+TOP_LEVEL = json.dumps(CASES)
+
+
+def test_keyed_array():
+    items, done = parse_json_array(KEYED, "test_cases")
+
+    assert items == CASES
+    assert done
+
+
+def test_top_level_array():
+    items, done = parse_json_array(TOP_LEVEL, "test_cases")
+
+    assert items == CASES
+    assert done
+
+
+def test_first_array_without_key():
+    assert parse_json_items(TOP_LEVEL) == CASES
+
+
+@pytest.mark.parametrize("text", [
+    f"```json\n{KEYED}\n```",
+    f"Here are the tests:\n```\n{TOP_LEVEL}\n```\nLet me know if you need more.",
+    f"Note [1]: {{see below}} and [the list]\n{KEYED}",
+    f"Here are [3] tests: {{\"draft\": true}} then\n{TOP_LEVEL}",
+])
+def test_prose_and_code_fences_are_skipped(text):
+    items, done = parse_json_array(text, "test_cases")
+
+    assert items == CASES
+    assert done
+
+
+@pytest.mark.parametrize("text", [KEYED, TOP_LEVEL])
+def test_truncated_output_keeps_complete_items(text):
+    cut = text[:text.index("TC003")]
+    items, done = parse_json_array(cut, "test_cases")
+
+    assert items == CASES[:2]
+    assert not done
+
+
+def test_truncated_inside_string_with_brackets():
+    cut = TOP_LEVEL[:TOP_LEVEL.index("Type ]") + 6]
+
+    assert parse_json_array(cut) == ([], False)
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_chunked_feed_matches_whole_text(size):
+    text = f"```json\n{KEYED}\n```"
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+
+    assert list(iter_json_items(chunks, "test_cases")) == CASES
+
+
+def test_other_arrays_before_key_are_ignored():
+    text = json.dumps({"tags": [{"name": "smoke"}], "test_cases": CASES[:1]})
+
+    assert parse_json_items(text, "test_cases") == CASES[:1]
+
+
+def test_text_after_closed_array_is_ignored():
+    text = TOP_LEVEL + '\n[{"test_id": "EXTRA"}]'
+
+    assert parse_json_items(text) == CASES
@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+
+from llm_client import LLMClient
+
+
+class APIError(Exception):
+    """Stands in for google.api_core errors, which carry an HTTP .code"""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Fails with the queued errors first, then answers; tracks concurrent calls"""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.delay)
+            if error is not None:
+                raise error
+            return Response(f"reply to {prompt}")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_client(model, **kwargs):
+    options = dict(requests_per_minute=60000, max_in_flight=5, timeout=5, max_retries=3, base_delay=0.01, max_delay=0.05)
+    options.update(kwargs)
+    return LLMClient(model, **options)
+
+
+@pytest.mark.parametrize("code", [429, 500, 503])
+def test_retries_rate_limits_and_server_errors(code):
+    model = StubModel([APIError(code), APIError(code)])
+    client = make_client(model)
+
+    assert client.generate_text("hi") == "reply to hi"
+    assert model.calls == 3
+    assert client.stats["retries"] == 2
+
+
+@pytest.mark.parametrize("code", [400, 403, 404])
+def test_client_errors_are_not_retried(code):
+    model = StubModel([APIError(code)])
+    client = make_client(model)
+
+    with pytest.raises(APIError):
+        client.generate_text("hi")
+    assert model.calls == 1
+    assert client.stats["failures"] == 1
+
+
+def test_gives_up_after_max_retries():
+    model = StubModel([APIError(503)] * 5)
+    client = make_client(model, max_retries=2)
+
+    with pytest.raises(APIError):
+        client.generate_text("hi")
+    assert model.calls == 3
+
+
+def test_slow_call_times_out_and_is_retried():
+    model = StubModel(delay=0.3)
+    client = make_client(model, timeout=0.1, max_retries=1)
+
+    with pytest.raises(TimeoutError):
+        client.generate_text("hi")
+    assert model.calls == 2
+
+
+def test_in_flight_calls_are_capped():
+    model = StubModel(delay=0.1)
+    client = make_client(model, max_in_flight=2)
+    threads = [threading.Thread(target=client.generate_text, args=(f"p{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.calls == 6
+    assert model.peak == 2
+
+
+def test_timed_out_thread_keeps_its_slot():
+    model = StubModel(delay=0.4)
+    client = make_client(model, max_in_flight=1, timeout=0.1, max_retries=0)
+
+    with pytest.raises(TimeoutError):
+        client.generate_text("slow")
+    model.delay = 0.0
+    client.generate_text("next")
+
+    assert model.peak == 1
+
+
+def test_backoff_is_full_jitter_within_max_delay():
+    client = make_client(StubModel(), base_delay=1.0, max_delay=4.0)
+
+    for attempt in range(6):
+        assert 0 <= client.backoff(attempt) <= min(4.0, 2 ** attempt)
+
+
+def test_clients_with_the_same_limit_key_share_limits():
+    model = StubModel(delay=0.1)
+    clients = [make_client(model, max_in_flight=1, limit_key="shared-model") for _ in range(2)]
+    threads = [threading.Thread(target=client.generate_text, args=("hi",)) for client in clients for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.calls == 4
+    assert model.peak == 1
+
+
+class StreamingModel:
+    """Streams parts with a pause before each one"""
+
+    def __init__(self, parts, pauses):
+        self.parts = parts
+        self.pauses = pauses
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        for text, pause in zip(self.parts, self.pauses):
+            time.sleep(pause)
+            yield Response(text)
+
+
+def test_stream_timeout_applies_between_chunks_not_to_the_whole_stream():
+    model = StreamingModel(["a", "b", "c", "d", "e"], [0.1] * 5)
+    client = make_client(model, timeout=0.25)
+
+    assert "".join(client.stream_text("hi")) == "abcde"  # 0.5 s in total
+    assert model.calls == 1
+
+
+def test_stream_that_stalls_times_out():
+    model = StreamingModel(["a", "b"], [0.05, 0.5])
+    client = make_client(model, timeout=0.2)
+    received = []
+
+    with pytest.raises(TimeoutError):
+        for chunk in client.stream_text("hi"):
+            received.append(chunk)
+    assert received == ["a"]
@@ -0,0 +1,78 @@
+import functools
+import os
+import shutil
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from extract import QuietHandler
+from readiness import create_waiter
+
+READINESS_SITE = os.path.join(os.path.dirname(__file__), "fixtures", "readiness")
+FETCH_DELAY = 0.8
+
+
+class DelayedFetchDriver:
+    """Replays the snapshots of fixtures/readiness/delayed.html
+
+    The document is complete and its DOM quiet almost at once, but the
+    fetch for fields.json stays in flight for FETCH_DELAY seconds and the
+    form is rendered when it returns.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+
+    def execute_script(self, script):
+        elapsed = time.monotonic() - self.started
+        fetched = elapsed >= FETCH_DELAY
+        return {
+            "state": "complete",
+            "resources": 1 if fetched else 0,
+            "pending": 0 if fetched else 1,
+            "quiet_ms": (elapsed - FETCH_DELAY if fetched else elapsed) * 1000,
+        }
+
+
+def test_auto_waits_for_delayed_fetch():
+    waiter = create_waiter("auto", adaptive=False, timeout=5.0)
+    result = waiter.wait(DelayedFetchDriver(), "http://127.0.0.1/delayed.html")
+
+    assert result["strategy"] == "ready_state+network_idle+dom_quiescence"
+    # The form renders at FETCH_DELAY and the DOM must then stay quiet
+    assert result["waited_ms"] >= (FETCH_DELAY + 0.3) * 1000
+
+
+def test_single_condition_can_fire_before_fetch():
+    waiter = create_waiter("dom_quiescence", adaptive=False, timeout=5.0)
+    result = waiter.wait(DelayedFetchDriver(), "http://127.0.0.1/delayed.html")
+
+    assert result["strategy"] == "dom_quiescence"
+    assert result["waited_ms"] < FETCH_DELAY * 1000
+
+
+class DelayedJsonHandler(QuietHandler):
+    def do_GET(self):
+        if self.path.endswith(".json"):
+            time.sleep(FETCH_DELAY)
+        super().do_GET()
+
+
+@pytest.mark.skipif(not shutil.which("msedgedriver"), reason="needs Edge and msedgedriver")
+def test_browser_extracts_form_rendered_after_fetch():
+    from crawl_backends import BrowserBackend
+
+    handler = functools.partial(DelayedJsonHandler, directory=READINESS_SITE)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    backend = BrowserBackend(readiness="auto")
+    try:
+        elements = backend.fetch(f"http://127.0.0.1:{server.server_address[1]}/delayed.html")
+    finally:
+        backend.close()
+        server.shutdown()
+
+    assert {inp["name"] for inp in elements["inputs"]} == {"email", "topics"}
+    assert elements["readiness"]["strategy"] != "timeout"